@@ -0,0 +1,42 @@
+# bench_flow.py
+# Every-frame MediaPipe inference vs. sparse detection + optical-flow tracking
+# on a recorded video: fps, CPU per frame and landmark error vs. every-frame.
+# The loop is bench_roi.run(), so both benchmarks measure the same thing.
+# Usage: python bench_flow.py session.mp4 [--every 2,3,5] [--roi]
+
+import sys
+
+import numpy as np
+
+from bench_roi import run
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: python bench_flow.py video.mp4 [--every 2,3,5] [--roi]")
+        return
+    path = sys.argv[1]
+    everies = [2, 3, 5]
+    if "--every" in sys.argv:
+        everies = [int(v) for v in sys.argv[sys.argv.index("--every") + 1].split(",")]
+    roi = "--roi" in sys.argv
+
+    ref, w_ref, c_ref, _ = run(path, roi)
+    n = len(ref)
+    print(f"frames {n}{'  (roi)' if roi else ''}")
+    print(f"every frame  {n / w_ref:6.1f} fps  cpu {1000 * c_ref / n:6.2f} ms/frame  "
+          f"detected {sum(p is not None for p in ref)}")
+    for every in everies:
+        got, w, c, summary = run(path, roi, every=every)
+        print(f"flow N={every:<3}  {n / w:6.1f} fps  cpu {1000 * c / n:6.2f} ms/frame  "
+              f"detected {sum(p is not None for p in got)}")
+        print("  " + summary.replace("\n", "\n  "))
+        err = [np.linalg.norm(a - b, axis=1).mean() for a, b in zip(ref, got)
+               if a is not None and b is not None]
+        if err:
+            print(f"  landmark error vs every-frame: mean {np.mean(err):.2f} px  "
+                  f"p95 {np.percentile(err, 95):.2f} px  max {np.max(err):.2f} px")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+# bench_forest.py
+# Checks FlatForest against sklearn on the recorded CSVs and times single-sample
+# prediction, which is what the mouse loop does once per frame.
+# Usage: python bench_forest.py [model.pkl]
+
+import os
+import sys
+import time
+import csv
+
+import joblib
+import numpy as np
+
+from forest_engine import FlatForest, MODEL_PATH
+from features import transform
+from dataset import CSV_FILES
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def load_rows():
+    X, y = [], []
+    for name in CSV_FILES:
+        with open(os.path.join(HERE, name), newline="") as f:
+            for row in csv.reader(f):
+                X.append([float(v) for v in row[:-1]])
+                y.append(row[-1])
+    return np.array(X), np.array(y)
+
+
+def per_call(fn, samples, repeat):
+    t0 = time.perf_counter()
+    for i in range(repeat):
+        fn(samples[i % len(samples)])
+    return (time.perf_counter() - t0) / repeat
+
+
+def main():
+    model = joblib.load(sys.argv[1] if len(sys.argv) > 1 else MODEL_PATH)
+    forest = FlatForest(model)
+    X, y = load_rows()
+    # sklearn gets the model's features; FlatForest always takes raw rows
+    Xm = transform(X) if forest.feature_spec else X
+
+    ref = model.predict(Xm)
+    batch = forest.predict(X)
+    one = np.array([forest.predict_one(x) for x in X])
+    print(f"rows {len(X)}  trees {forest.n_trees}  nodes {len(forest.feature)}  depth {forest.depth}  "
+          f"features {forest.feature_spec or 'raw'}")
+    print(f"identical to sklearn: batch {np.array_equal(ref, batch)}  single {np.array_equal(ref, one)}")
+    print(f"max |proba diff| {np.abs(model.predict_proba(Xm) - forest.predict_proba(X)).max():.3g}")
+    print(f"accuracy vs labels {np.mean(ref == y):.4f}")
+
+    samples = [x.reshape(1, -1) for x in X[:200]]
+    if forest.feature_spec:
+        t_sk = per_call(lambda x: model.predict(transform(x)), samples, 200)
+    else:
+        t_sk = per_call(model.predict, samples, 200)
+    t_flat = per_call(forest.predict_one, X[:200].astype(np.float32), 5000)
+    print(f"single sample: sklearn {1e6 * t_sk:8.1f} us  flat {1e6 * t_flat:6.1f} us  "
+          f"({t_sk / t_flat:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# bench_quantiles.py
+# Compares the old per-frame np.percentile bounds against SlidingQuantile.
+# Usage: python bench_quantiles.py [frames]
+
+import sys
+import time
+from collections import deque
+
+import numpy as np
+
+from window_stats import SlidingQuantile
+
+LOW_PER = 4
+HIGH_PER = 96
+HIST_LENS = [450, 1000, 2500, 5000, 10000]
+
+
+def anchor_stream(n, seed=0):
+    # random walk of a fingertip anchor, clipped to the camera frame
+    rng = np.random.default_rng(seed)
+    x = np.clip(0.5 + np.cumsum(rng.normal(0, 0.01, n)), 0, 1)
+    y = np.clip(0.5 + np.cumsum(rng.normal(0, 0.01, n)), 0, 1)
+    return x.tolist(), y.tolist()
+
+
+def run_numpy(xs, ys, hist_len):
+    hist_x = deque(maxlen=hist_len)
+    hist_y = deque(maxlen=hist_len)
+    out = []
+    t0 = time.perf_counter()
+    for ax, ay in zip(xs, ys):
+        hist_x.append(ax); hist_y.append(ay)
+        ax_arr = np.array(hist_x); ay_arr = np.array(hist_y)
+        out.append((float(np.percentile(ax_arr, LOW_PER)), float(np.percentile(ax_arr, HIGH_PER)),
+                    float(np.percentile(ay_arr, LOW_PER)), float(np.percentile(ay_arr, HIGH_PER))))
+    return time.perf_counter() - t0, out
+
+
+def run_sliding(xs, ys, hist_len):
+    hist_x = SlidingQuantile(hist_len)
+    hist_y = SlidingQuantile(hist_len)
+    out = []
+    t0 = time.perf_counter()
+    for ax, ay in zip(xs, ys):
+        hist_x.append(ax); hist_y.append(ay)
+        out.append((hist_x.percentile(LOW_PER), hist_x.percentile(HIGH_PER),
+                    hist_y.percentile(LOW_PER), hist_y.percentile(HIGH_PER)))
+    return time.perf_counter() - t0, out
+
+
+def main():
+    frames = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    print(f"{'HIST_LEN':>8} {'numpy us/frame':>15} {'sliding us/frame':>17} {'speedup':>8}  identical")
+    for hist_len in HIST_LENS:
+        n = max(frames, 2 * hist_len)
+        xs, ys = anchor_stream(n)
+        t_np, ref = run_numpy(xs, ys, hist_len)
+        t_sl, got = run_sliding(xs, ys, hist_len)
+        print(f"{hist_len:>8} {1e6 * t_np / n:>15.1f} {1e6 * t_sl / n:>17.1f} "
+              f"{t_np / t_sl:>7.1f}x  {ref == got}")
+
+
+if __name__ == "__main__":
+    main()
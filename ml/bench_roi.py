@@ -0,0 +1,79 @@
+# bench_roi.py
+# Full-frame vs ROI-cropped MediaPipe inference on a recorded video.
+# The ROI summary counts box moves and graph resets (each one re-detects the
+# palm in the new crop); the landmark difference against full-frame
+# inference is the accuracy cost of cropping. --flow wraps both runs in
+# FlowHands, so the box is carried along by the flow-tracked landmarks.
+# run() is shared with bench_flow.py.
+# Usage: python bench_roi.py session.mp4 [--size 224] [--flow]
+
+import sys
+import time
+
+import cv2
+import mediapipe as mp
+import numpy as np
+
+from roi_hands import RoiHands, ROI_SIZE
+from flow_hands import FlowHands, FLOW_EVERY
+
+CAM_W, CAM_H = 640, 480
+
+
+def run(path, roi=False, size=ROI_SIZE, every=1):
+    """Per-frame landmarks (px, or None), wall s, CPU s and the wrappers' summaries.
+
+    roi crops with RoiHands, every > 1 detects every N-th frame with FlowHands."""
+    cap = cv2.VideoCapture(path)
+    out = []
+    cpu0, t0 = time.process_time(), time.perf_counter()
+    with mp.solutions.hands.Hands(max_num_hands=1, model_complexity=1,
+                                  min_detection_confidence=0.72,
+                                  min_tracking_confidence=0.72) as hands:
+        proc = RoiHands(hands, size=size) if roi else hands
+        wrappers = [proc] if roi else []
+        if every > 1:
+            proc = FlowHands(proc, every=every)
+            wrappers.append(proc)
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frame = cv2.resize(cv2.flip(frame, 1), (CAM_W, CAM_H))
+            res = proc.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            if res.multi_hand_landmarks:
+                lm = res.multi_hand_landmarks[0].landmark
+                out.append(np.array([(l.x * CAM_W, l.y * CAM_H) for l in lm]))
+            else:
+                out.append(None)
+    wall, cpu = time.perf_counter() - t0, time.process_time() - cpu0
+    cap.release()
+    return out, wall, cpu, "\n".join(p.summary() for p in wrappers)
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: python bench_roi.py video.mp4 [--size N] [--flow]")
+        return
+    path = sys.argv[1]
+    size = int(sys.argv[sys.argv.index("--size") + 1]) if "--size" in sys.argv else ROI_SIZE
+
+    every = FLOW_EVERY if "--flow" in sys.argv else 1
+    full, w_full, c_full, _ = run(path, False, size, every)
+    roi, w_roi, c_roi, summary = run(path, True, size, every)
+    n = len(full)
+    print(f"frames {n}")
+    print(f"full  {n / w_full:6.1f} fps  cpu {1000 * c_full / n:6.2f} ms/frame  "
+          f"detected {sum(p is not None for p in full)}")
+    print(f"roi   {n / w_roi:6.1f} fps  cpu {1000 * c_roi / n:6.2f} ms/frame  "
+          f"detected {sum(p is not None for p in roi)}  (size {size})")
+    print(summary)
+    err = [np.linalg.norm(a - b, axis=1).mean() for a, b in zip(full, roi)
+           if a is not None and b is not None]
+    if err:
+        print(f"landmark difference vs full frame: mean {np.mean(err):.2f} px  "
+              f"p95 {np.percentile(err, 95):.2f} px")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,11 @@
 import cv2
 import mediapipe as mp
-import csv
 import sys
+import time
+
+from hand_frame import HandFrame
+from dataset import GestureDataset, SampleWriter
+from frame_buffers import FrameSlot, MemStats, mirror_hands
 
 # Usage: python collect_data.py MOVE
 gesture_label = sys.argv[1]
@@ -15,40 +19,60 @@ hands = mp_hands.Hands(
 mp_draw = mp.solutions.drawing_utils
 
 cap = cv2.VideoCapture(0)
+cam_fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+hf = HandFrame()
+slot = FrameSlot()      # reused camera/RGB/preview buffers
+mem = MemStats()
 
-filename = f"{gesture_label}.csv"
+dataset = GestureDataset()
 
 print(f"Recording gesture: {gesture_label}")
 print("Press Q to stop")
 
-with open(filename, "w", newline="") as f:
-    writer = csv.writer(f)
+with dataset.begin_session(gesture_label) as session:
+    # disk writes happen on a background thread, never in the capture loop
+    writer = SampleWriter(session)
+    writer.start()
+    frames = 0
+    dropped_frames = 0
+    last_t = None
 
     while True:
-        ret, frame = cap.read()
-        if not ret:
+        if not slot.read(cap):
             break
 
-        frame = cv2.flip(frame, 1)
-        rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = hands.process(rgb)
+        # camera frames we missed because the loop was too slow
+        now = time.perf_counter()
+        if last_t is not None:
+            missed = int((now - last_t) * cam_fps + 0.5) - 1
+            if missed > 0:
+                dropped_frames += missed
+        last_t = now
+        frames += 1
+
+        # landmarks are mirrored instead of flipping the camera image
+        result = mirror_hands(hands.process(slot.to_rgb()))
+        frame = slot.preview()
 
         if result.multi_hand_landmarks:
             hand = result.multi_hand_landmarks[0]
             mp_draw.draw_landmarks(frame, hand, mp_hands.HAND_CONNECTIONS)
 
-            row = []
-            for lm in hand.landmark:
-                row.append(lm.x)
-                row.append(lm.y)
-
-            row.append(gesture_label)
-            writer.writerow(row)
+            writer.submit(hf.load(hand).xy)
 
+        cv2.putText(frame, f"{writer.submitted} samples  {writer.rate():.1f}/s  "
+                    f"dropped frames {dropped_frames} samples {writer.dropped}",
+                    (8, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 0), 1)
         cv2.imshow("Data Collection - Press Q", frame)
+        mem.tick()
         if cv2.waitKey(1) & 0xFF == ord('q'):
             break
 
+    writer.close()
+
 cap.release()
 cv2.destroyAllWindows()
-print("Saved:", filename)
+print(f"Saved {session.rows} samples to {dataset.root} (session {session.sid})")
+print(f"{frames} frames, {writer.rate():.1f} samples/s, "
+      f"dropped {dropped_frames} camera frames and {writer.dropped} samples")
+print(mem.summary())
@@ -0,0 +1,115 @@
+# commands.py
+# Declarative voice-command registry with a token index and a worker pool.
+#
+# A command is a set of words that must all appear in the utterance
+# ("open github"), an action and an optional reply shown immediately.
+# compile() builds word -> [command ids]; match() looks up only the words
+# that were actually spoken and counts hits, so matching cost depends on the
+# utterance length, not on how many commands are registered. When several
+# commands match, the one registered first wins (the old if/elif order).
+#
+# Actions run on a small thread pool, so the listener goes straight back to
+# listening. summary() reports match time, queue wait and action run time.
+
+import time
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+WORKERS = 2
+
+
+class Command:
+    __slots__ = ("cid", "words", "action", "reply", "rest")
+
+    def __init__(self, cid, words, action, reply=None, rest=False):
+        self.cid = cid
+        self.words = tuple(words.split()) if isinstance(words, str) else tuple(words)
+        self.action = action
+        self.reply = reply
+        self.rest = rest            # pass the remaining words to the action
+
+
+class CommandRegistry:
+    def __init__(self, on_reply=None, workers=WORKERS):
+        self.on_reply = on_reply or (lambda text: None)
+        self.commands = []
+        self.index = {}
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="command")
+        self._lock = threading.Lock()
+        self.match_s = deque(maxlen=500)
+        self.wait_s = deque(maxlen=500)
+        self.run_s = deque(maxlen=500)
+        self.errors = 0
+
+    def add(self, words, action, reply=None, rest=False):
+        self.commands.append(Command(len(self.commands), words, action, reply, rest))
+        self.index = {}
+
+    def compile(self):
+        index = {}
+        for c in self.commands:
+            for w in set(c.words):
+                index.setdefault(w, []).append(c.cid)
+        self.index = index
+        return self
+
+    def match(self, text):
+        """Returns (command, rest_text) or (None, "")."""
+        if not self.index:
+            self.compile()
+        tokens = text.lower().split()
+        hits = {}
+        for w in set(tokens):
+            for cid in self.index.get(w, ()):
+                hits[cid] = hits.get(cid, 0) + 1
+        best = None
+        for cid, n in hits.items():
+            if n == len(set(self.commands[cid].words)) and (best is None or cid < best):
+                best = cid
+        if best is None:
+            return None, ""
+        cmd = self.commands[best]
+        rest = " ".join(t for t in tokens if t not in cmd.words) if cmd.rest else ""
+        return cmd, rest
+
+    def dispatch(self, text):
+        """Match and queue the action; returns the command or None. Never blocks on the action."""
+        t0 = time.perf_counter()
+        cmd, rest = self.match(text)
+        t1 = time.perf_counter()
+        with self._lock:
+            self.match_s.append(t1 - t0)
+        if cmd is None:
+            return None
+        if cmd.reply:
+            self.on_reply(cmd.reply)
+        args = (rest,) if cmd.rest else ()
+        self._pool.submit(self._run, cmd, args, t1)
+        return cmd
+
+    def _run(self, cmd, args, t_submit):
+        t0 = time.perf_counter()
+        try:
+            cmd.action(*args)
+        except Exception as e:
+            self.errors += 1
+            self.on_reply(f"{' '.join(cmd.words)} failed: {e}")
+        t1 = time.perf_counter()
+        with self._lock:
+            self.wait_s.append(t0 - t_submit)
+            self.run_s.append(t1 - t0)
+
+    def close(self, wait=False):
+        self._pool.shutdown(wait=wait)
+
+    def summary(self):
+        def p(vals, q):
+            v = sorted(vals)
+            return v[min(len(v) - 1, int(len(v) * q))] if v else 0.0
+        with self._lock:
+            return (f"commands {len(self.commands)} registered  {len(self.run_s)} run  errors {self.errors}  "
+                    f"match p50 {1e6 * p(self.match_s, 0.5):.1f} us  "
+                    f"dispatch wait p50 {1000 * p(self.wait_s, 0.5):.2f} ms  "
+                    f"p95 {1000 * p(self.wait_s, 0.95):.2f} ms  "
+                    f"run p50 {1000 * p(self.run_s, 0.5):.1f} ms")
@@ -0,0 +1,202 @@
+# cursor_filter.py
+# Pluggable cursor smoothing for the gesture engines.
+#
+#   ema      fixed-alpha EMA with a pixel deadzone (the original behaviour)
+#   oneeuro  One Euro filter: heavy smoothing at rest, little lag when moving
+#   kalman   constant-velocity Kalman filter that forward-predicts by `lead`
+#            seconds, normally the measured capture -> cursor latency
+#
+# Every filter has the same interface:
+#   step(x, y, t) -> (x, y, move)   t in seconds; move=False means "stay put"
+#   reset(x, y)                     jump the state (e.g. after a drag)
+#   x, y                            current output position
+#
+# Parameters can be tuned per deployment with --filter=NAME[:k=v,...] or a
+# cursor_filter.json file ({"name": "oneeuro", "params": {"beta": 0.02}}).
+
+import os
+import sys
+import json
+import math
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(HERE, "cursor_filter.json")
+
+# a gap this long (cursor posture released) restarts the adaptive filters
+MAX_GAP_S = 0.3
+MAX_LEAD_S = 0.15
+
+
+class EmaFilter:
+    """prev += (target - prev) * alpha, applied only past the deadzone.
+
+    gate="step" checks the smoothed step (inference_mouse.py),
+    gate="target" checks the raw distance to the target (v1_basic_mouse.py).
+    """
+
+    def __init__(self, alpha=0.12, deadzone=6.0, gate="step", x=0.0, y=0.0):
+        self.alpha = alpha
+        self.deadzone = deadzone
+        self.gate = gate
+        self.x, self.y = x, y
+
+    def reset(self, x, y):
+        self.x, self.y = x, y
+
+    def step(self, tx, ty, t):
+        dx, dy = tx - self.x, ty - self.y
+        if self.gate == "target":
+            if abs(dx) > self.deadzone or abs(dy) > self.deadzone:
+                self.x += dx * self.alpha
+                self.y += dy * self.alpha
+                return self.x, self.y, True
+            return self.x, self.y, False
+        sx = self.x + dx * self.alpha
+        sy = self.y + dy * self.alpha
+        if abs(sx - self.x) > self.deadzone or abs(sy - self.y) > self.deadzone:
+            self.x, self.y = sx, sy
+            return sx, sy, True
+        return self.x, self.y, False
+
+
+def _alpha(cutoff, dt):
+    tau = 1.0 / (2.0 * math.pi * cutoff)
+    return 1.0 / (1.0 + tau / dt)
+
+
+class OneEuroFilter:
+    """Casiez et al. 2012. Cutoff rises with speed: min_cutoff + beta * |v|."""
+
+    def __init__(self, min_cutoff=1.0, beta=0.007, d_cutoff=1.0, x=0.0, y=0.0):
+        self.min_cutoff = min_cutoff
+        self.beta = beta
+        self.d_cutoff = d_cutoff
+        self.x, self.y = x, y
+        self._t = None
+        self._dx = self._dy = 0.0
+
+    def reset(self, x, y):
+        self.x, self.y = x, y
+        self._t = None
+        self._dx = self._dy = 0.0
+
+    def step(self, tx, ty, t):
+        if self._t is None or t - self._t > MAX_GAP_S or t <= self._t:
+            restart = self._t is None or t - self._t > MAX_GAP_S
+            if restart:
+                self.x, self.y = tx, ty
+                self._dx = self._dy = 0.0
+            self._t = t
+            return self.x, self.y, restart
+        dt = t - self._t
+        self._t = t
+        ad = _alpha(self.d_cutoff, dt)
+        self._dx += ad * ((tx - self.x) / dt - self._dx)
+        self._dy += ad * ((ty - self.y) / dt - self._dy)
+        speed = math.hypot(self._dx, self._dy)
+        a = _alpha(self.min_cutoff + self.beta * speed, dt)
+        self.x += a * (tx - self.x)
+        self.y += a * (ty - self.y)
+        return self.x, self.y, True
+
+
+class _Kalman1D:
+    # state [p, v], constant-velocity model with white-noise acceleration q
+    __slots__ = ("p", "v", "P00", "P01", "P11")
+
+    def __init__(self, p):
+        self.p, self.v = p, 0.0
+        self.P00, self.P01, self.P11 = 1e4, 0.0, 1e4
+
+    def update(self, z, dt, q, r):
+        # predict
+        self.p += self.v * dt
+        dt2 = dt * dt
+        P00 = self.P00 + dt * (2 * self.P01 + dt * self.P11) + q * dt2 * dt2 / 4
+        P01 = self.P01 + dt * self.P11 + q * dt2 * dt / 2
+        P11 = self.P11 + q * dt2
+        # correct with position measurement z
+        s = P00 + r
+        k0, k1 = P00 / s, P01 / s
+        e = z - self.p
+        self.p += k0 * e
+        self.v += k1 * e
+        self.P00 = (1 - k0) * P00
+        self.P01 = (1 - k0) * P01
+        self.P11 = P11 - k1 * P01
+
+
+class KalmanFilter:
+    """Constant-velocity Kalman filter per axis with `lead` seconds of prediction.
+
+    q: acceleration noise (px^2/s^4), r: measurement noise (px^2).
+    """
+
+    def __init__(self, q=2e6, r=60.0, lead=0.0, x=0.0, y=0.0):
+        self.q = q
+        self.r = r
+        self.lead = lead
+        self.x, self.y = x, y
+        self._kx = self._ky = None
+        self._t = None
+
+    def set_lead(self, seconds):
+        self.lead = max(0.0, min(MAX_LEAD_S, seconds))
+
+    def reset(self, x, y):
+        self.x, self.y = x, y
+        self._kx = self._ky = None
+        self._t = None
+
+    def step(self, tx, ty, t):
+        if self._kx is None or t - self._t > MAX_GAP_S:
+            self._kx, self._ky = _Kalman1D(tx), _Kalman1D(ty)
+            self._t = t
+            self.x, self.y = tx, ty
+            return tx, ty, True
+        dt = t - self._t
+        if dt <= 0:
+            return self.x, self.y, False
+        self._t = t
+        self._kx.update(tx, dt, self.q, self.r)
+        self._ky.update(ty, dt, self.q, self.r)
+        self.x = self._kx.p + self._kx.v * self.lead
+        self.y = self._ky.p + self._ky.v * self.lead
+        return self.x, self.y, True
+
+
+FILTERS = {"ema": EmaFilter, "oneeuro": OneEuroFilter, "kalman": KalmanFilter}
+
+
+def parse_spec(spec):
+    """'oneeuro:min_cutoff=1.5,beta=0.01' -> ('oneeuro', {...})"""
+    name, _, rest = spec.partition(":")
+    params = {}
+    for kv in filter(None, rest.split(",")):
+        k, v = kv.split("=", 1)
+        params[k.strip()] = v.strip() if k.strip() == "gate" else float(v)
+    return name, params
+
+
+def make_filter(name="ema", **params):
+    return FILTERS[name](**params)
+
+
+def filter_from_config(default_name, default_params, argv=None, config_path=CONFIG_PATH):
+    """--filter=NAME[:k=v,...] beats cursor_filter.json beats the engine default."""
+    name, params = default_name, dict(default_params)
+    if os.path.exists(config_path):
+        with open(config_path) as f:
+            cfg = json.load(f)
+        if cfg.get("name", name) != name:
+            params = {}
+        name = cfg.get("name", name)
+        params.update(cfg.get("params", {}))
+    for arg in (sys.argv if argv is None else argv):
+        if arg.startswith("--filter="):
+            new_name, new_params = parse_spec(arg.split("=", 1)[1])
+            if new_name != name:
+                params = {}
+            name = new_name
+            params.update(new_params)
+    return make_filter(name, **params)
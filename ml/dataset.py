@@ -0,0 +1,344 @@
+# dataset.py
+# Columnar binary store for landmark samples.
+#
+#   gesture_data/features.f32   float32 rows of N_FEATURES (x0,y0,x1,y1,...)
+#   gesture_data/labels.u8      label id per row
+#   gesture_data/sessions.u32   recording session id per row
+#   gesture_data/meta.json      label names and session list
+#
+# Appends are plain writes at the end of each column file, reads are
+# memory-mapped, so neither cost grows with the size of the store. Session
+# row counts reach meta.json on every flush; rows written after the last
+# flush of a crashed session are recounted from sessions.u32 on the next open.
+#
+# CSV imports are recorded in meta["imports"] (absolute path -> rows and a
+# hash of those rows), so importing the same file again is a no-op and a file
+# that was appended to only adds its new rows. A file whose imported rows
+# changed is refused rather than imported twice. Rows without a label column
+# take the label from the file name (DRAG.csv -> DRAG), like collect_data.py.
+#
+# Usage:
+#   python dataset.py import [MOVE.csv LEFT_CLICK.csv ...]   # default: ml/*.csv
+#   python dataset.py info
+
+import os
+import sys
+import csv
+import json
+import time
+import queue
+import hashlib
+import threading
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.join(HERE, "gesture_data")
+N_FEATURES = 42
+CSV_FILES = ["MOVE.csv", "LEFT_CLICK.csv", "RIGHT_CLICK.csv", "DRAG.csv"]
+
+_COLUMNS = {
+    "features": ("features.f32", np.float32),
+    "labels": ("labels.u8", np.uint8),
+    "sessions": ("sessions.u32", np.uint32),
+}
+
+
+class GestureDataset:
+    """One writer at a time; any number of memory-mapped readers."""
+
+    def __init__(self, root=DATA_DIR, n_features=N_FEATURES):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+        self._meta_path = os.path.join(root, "meta.json")
+        if os.path.exists(self._meta_path):
+            with open(self._meta_path) as f:
+                self.meta = json.load(f)
+        else:
+            self.meta = {"version": 1, "n_features": n_features, "labels": [], "sessions": []}
+        self.n_features = self.meta["n_features"]
+        self._repair()
+
+    # ---------- paths / size ----------
+    def _path(self, col):
+        return os.path.join(self.root, _COLUMNS[col][0])
+
+    def _rows_in(self, col):
+        p = self._path(col)
+        if not os.path.exists(p):
+            return 0
+        width = self.n_features if col == "features" else 1
+        return os.path.getsize(p) // (width * np.dtype(_COLUMNS[col][1]).itemsize)
+
+    def _repair(self):
+        # drop a partially written trailing row (e.g. after a crash mid-append)
+        n = min(self._rows_in(c) for c in _COLUMNS)
+        self._truncate(n)
+        # rows appended after a session's last flush are on disk but not in meta
+        sessions = self.meta["sessions"]
+        if sum(s["rows"] for s in sessions) != n and sessions:
+            counts = np.bincount(self.session_ids(), minlength=len(sessions))
+            for sess, c in zip(sessions, counts.tolist()):
+                sess["rows"] = c
+            self._save_meta()
+
+    def _truncate(self, n):
+        for col, (name, dtype) in _COLUMNS.items():
+            width = self.n_features if col == "features" else 1
+            size = n * width * np.dtype(dtype).itemsize
+            p = self._path(col)
+            if not os.path.exists(p):
+                open(p, "wb").close()
+            elif os.path.getsize(p) != size:
+                os.truncate(p, size)
+
+    def __len__(self):
+        return self._rows_in("labels")
+
+    def _save_meta(self):
+        tmp = self._meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f, indent=1)
+        os.replace(tmp, self._meta_path)
+
+    # ---------- labels / sessions ----------
+    @property
+    def labels(self):
+        return self.meta["labels"]
+
+    def label_id(self, name):
+        if name not in self.meta["labels"]:
+            if len(self.meta["labels"]) >= 255:
+                raise ValueError("too many labels for a uint8 label column")
+            self.meta["labels"].append(name)
+            self._save_meta()
+        return self.meta["labels"].index(name)
+
+    def begin_session(self, label, source="camera"):
+        lid = self.label_id(label)
+        sid = len(self.meta["sessions"])
+        self.meta["sessions"].append({
+            "id": sid, "label": label, "source": source,
+            "start_row": len(self), "rows": 0, "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        })
+        self._save_meta()
+        return Session(self, sid, lid)
+
+    # ---------- reads ----------
+    def column(self, col):
+        n = len(self)
+        if n == 0:
+            width = (0, self.n_features) if col == "features" else (0,)
+            return np.zeros(width, _COLUMNS[col][1])
+        shape = (n, self.n_features) if col == "features" else (n,)
+        return np.memmap(self._path(col), dtype=_COLUMNS[col][1], mode="r", shape=shape)
+
+    def features(self):
+        return self.column("features")
+
+    def label_ids(self):
+        return self.column("labels")
+
+    def session_ids(self):
+        return self.column("sessions")
+
+    def label_names(self):
+        return np.asarray(self.labels, dtype=object)[self.label_ids()]
+
+
+class Session:
+    """Append handle for one recording session of a single label."""
+
+    def __init__(self, ds, sid, lid):
+        self.ds = ds
+        self.sid = sid
+        self.lid = lid
+        self.rows = 0
+        self._files = {c: open(ds._path(c), "ab") for c in _COLUMNS}
+
+    def append(self, X):
+        X = np.asarray(X, np.float32).reshape(-1, self.ds.n_features)
+        n = len(X)
+        if n == 0:
+            return
+        self._files["features"].write(np.ascontiguousarray(X).tobytes())
+        self._files["labels"].write(np.full(n, self.lid, np.uint8).tobytes())
+        self._files["sessions"].write(np.full(n, self.sid, np.uint32).tobytes())
+        self.rows += n
+
+    def flush(self):
+        for f in self._files.values():
+            f.flush()
+        # the index never counts fewer rows than the flushed columns hold
+        self._save_rows()
+
+    def _save_rows(self):
+        meta = self.ds.meta["sessions"][self.sid]
+        if meta["rows"] != self.rows:
+            meta["rows"] = self.rows
+            self.ds._save_meta()
+
+    def close(self):
+        for f in self._files.values():
+            f.close()
+        self._save_rows()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class SampleWriter(threading.Thread):
+    """Background writer for a Session, fed from the capture loop.
+
+    submit() copies one sample into a preallocated slot and returns at once;
+    the writer thread appends filled slots to the store in batches. When all
+    slots are in flight the sample is dropped and counted, so the capture
+    loop never blocks on disk.
+    """
+
+    def __init__(self, session, slots=512, batch=64, flush_every=1.0):
+        super().__init__(name="sample-writer", daemon=True)
+        nf = session.ds.n_features
+        self.session = session
+        self.batch = batch
+        self.flush_every = flush_every
+        self._free = queue.SimpleQueue()
+        for _ in range(slots):
+            self._free.put(np.zeros(nf, np.float32))
+        self._filled = queue.SimpleQueue()
+        self._batch = np.zeros((batch, nf), np.float32)
+        self.submitted = 0
+        self.written = 0
+        self.dropped = 0
+        self._t_start = time.perf_counter()
+
+    def submit(self, sample):
+        try:
+            slot = self._free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        np.copyto(slot, sample, casting="same_kind")
+        self._filled.put(slot)
+        self.submitted += 1
+        return True
+
+    def run(self):
+        last_flush = time.perf_counter()
+        done = False
+        while not done:
+            try:
+                slot = self._filled.get(timeout=0.2)
+            except queue.Empty:
+                slot = False
+            n = 0
+            while slot is not False:
+                if slot is None:
+                    done = True
+                    break
+                self._batch[n] = slot
+                self._free.put(slot)
+                n += 1
+                if n == self.batch:
+                    break
+                try:
+                    slot = self._filled.get_nowait()
+                except queue.Empty:
+                    slot = False
+            if n:
+                self.session.append(self._batch[:n])
+                self.written += n
+            if time.perf_counter() - last_flush > self.flush_every:
+                self.session.flush()
+                last_flush = time.perf_counter()
+        self.session.flush()
+
+    def rate(self):
+        el = time.perf_counter() - self._t_start
+        return self.written / el if el > 0 else 0.0
+
+    def close(self):
+        self._filled.put(None)
+        self.join()
+
+
+def import_csv(ds, path, label=None):
+    """Imports the rows of `path` not imported before; returns their number.
+
+    Raises ValueError if rows imported earlier have changed since."""
+    key = os.path.abspath(path)
+    label = label or os.path.splitext(os.path.basename(path))[0]
+    done = ds.meta.setdefault("imports", {}).get(key, {"rows": 0, "hash": None})
+    h = hashlib.blake2b(digest_size=8)
+    prefix = None
+    X, labels = [], []
+    n_rows = 0
+    with open(path, newline="") as f:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            if n_rows == done["rows"]:
+                prefix = h.hexdigest()
+            h.update(",".join(row).encode() + b"\n")
+            n_rows += 1
+            if n_rows <= done["rows"]:
+                continue
+            name = row[ds.n_features] if len(row) > ds.n_features else label
+            if not name:
+                raise ValueError(f"{path}: row {n_rows} has no label")
+            X.append([float(v) for v in row[:ds.n_features]])
+            labels.append(name)
+    if n_rows == done["rows"]:
+        prefix = h.hexdigest()
+    if done["rows"] and prefix != done["hash"]:
+        raise ValueError(f"{path}: the {done['rows']} rows imported before have changed; "
+                         "import it into a fresh dataset instead")
+    if X:
+        _append_by_label(ds, path, X, labels)
+    ds.meta["imports"][key] = {"rows": n_rows, "hash": h.hexdigest()}
+    ds._save_meta()
+    return len(X)
+
+
+def _append_by_label(ds, path, X, labels):
+    # one session per label found in the file (collect_data writes one label per file)
+    X = np.asarray(X, np.float32)
+    names = np.asarray(labels)
+    for name in dict.fromkeys(labels):
+        with ds.begin_session(name, source=os.path.basename(path)) as s:
+            s.append(X[names == name])
+
+
+def import_csvs(ds, paths=None):
+    paths = paths or [os.path.join(HERE, f) for f in CSV_FILES]
+    total = 0
+    for p in paths:
+        try:
+            n = import_csv(ds, p)
+        except ValueError as e:
+            print(f"skipped: {e}")
+            continue
+        print(f"imported {n:6d} rows from {p}" + ("" if n else " (already imported)"))
+        total += n
+    return total
+
+
+def main():
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "info"
+    ds = GestureDataset()
+    if cmd == "import":
+        import_csvs(ds, sys.argv[2:])
+    elif cmd != "info":
+        print("usage: python dataset.py [import [files.csv ...] | info]")
+        return
+    print(f"{ds.root}: {len(ds)} rows, {len(ds.meta['sessions'])} sessions")
+    ids = ds.label_ids()
+    for i, name in enumerate(ds.labels):
+        print(f"  {name:<12} {int(np.count_nonzero(ids == i)):7d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+# eval_filters.py
+# Offline lag vs. jitter evaluation of the cursor filters on recorded landmarks.
+#
+# The unfiltered cursor targets are taken from the gesture engine while the
+# cursor posture is held (ML mode when gesture_model.pkl exists, since the
+# rule-mode posture is rarely met in the CSV recordings), then every filter
+# is run over the same target segments:
+#
+#   lag_ms     time shift that best aligns the output with the raw target
+#              (negative = the filter predicts ahead)
+#   jitter_px  RMS of the output around its own 5-frame centred mean
+#   err_px     mean distance between output and raw target at zero shift
+#
+# Usage:
+#   python eval_filters.py
+#   python eval_filters.py MOVE.csv --filter oneeuro:beta=0.02 --filter kalman:lead=0.05
+
+import os
+import argparse
+
+import numpy as np
+
+from cursor_filter import make_filter, parse_spec
+from gesture_engine import CURSOR_FILTER, CURSOR_FILTER_PARAMS
+from pointer import FakePointer
+from replay import csv_frames, make_engine, HERE, CSV_FILES
+
+DEFAULT_SPECS = [
+    "ema",
+    "ema:alpha=0.3,deadzone=3",
+    "oneeuro",
+    "oneeuro:min_cutoff=0.5,beta=0.02",
+    "kalman",
+    "kalman:lead=0.05",
+]
+SHIFTS_MS = np.arange(-150, 301, 1)
+
+
+def target_segments(frames, ml=True):
+    # runs of consecutive cursor-active frames: [(t[n], xy[n, 2]), ...]
+    engine = make_engine("hand", FakePointer(), ml)
+    segs, cur = [], []
+    for t, hf in frames:
+        engine.step(hf, t)
+        if engine.target is not None:
+            cur.append((t, *engine.target))
+        elif cur:
+            segs.append(cur)
+            cur = []
+    if cur:
+        segs.append(cur)
+    return [(np.array([s[0] for s in seg]), np.array([s[1:] for s in seg]))
+            for seg in segs if len(seg) >= 5]
+
+
+def run_filter(spec, segs):
+    name, params = parse_spec(spec)
+    if name == CURSOR_FILTER and not params:
+        params = dict(CURSOR_FILTER_PARAMS)
+    outs = []
+    for t, xy in segs:
+        f = make_filter(name, **params)
+        f.reset(*xy[0])
+        out = np.empty_like(xy)
+        for i in range(len(t)):
+            out[i, 0], out[i, 1], _ = f.step(xy[i, 0], xy[i, 1], t[i])
+        outs.append(out)
+    return outs
+
+
+def jitter(seg_xy):
+    res = []
+    for xy in seg_xy:
+        k = np.ones(5) / 5.0
+        for c in range(2):
+            sm = np.convolve(xy[:, c], k, mode="valid")
+            res.append(xy[2:-2, c] - sm)
+    res = np.concatenate(res) if res else np.zeros(1)
+    return float(np.sqrt(np.mean(res ** 2)))
+
+
+def lag_ms(segs, outs):
+    # out(t) ~ target(t - lag): search the shift with the lowest mean error
+    best, best_err = 0.0, np.inf
+    for s in SHIFTS_MS:
+        err, n = 0.0, 0
+        for (t, xy), out in zip(segs, outs):
+            ts = t - s / 1000.0
+            ok = (ts >= t[0]) & (ts <= t[-1])
+            if not ok.any():
+                continue
+            tx = np.interp(ts[ok], t, xy[:, 0])
+            ty = np.interp(ts[ok], t, xy[:, 1])
+            err += np.hypot(out[ok, 0] - tx, out[ok, 1] - ty).sum()
+            n += ok.sum()
+        if n and err / n < best_err:
+            best, best_err = float(s), err / n
+    return best
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Offline lag/jitter evaluation of cursor filters")
+    ap.add_argument("csv", nargs="*", help="landmark CSVs (default: ml/*.csv)")
+    ap.add_argument("--filter", action="append", help="filter spec (repeatable)")
+    ap.add_argument("--fps", type=float, default=30.0, help="assumed camera rate for CSV rows")
+    ap.add_argument("--rules", action="store_true", help="cursor posture from finger rules, not the model")
+    args = ap.parse_args()
+
+    paths = args.csv or [os.path.join(HERE, f) for f in CSV_FILES]
+    segs = target_segments(csv_frames(paths, args.fps), ml=not args.rules)
+    n = sum(len(t) for t, _ in segs)
+    if not n:
+        print("no cursor-active frames in the recordings")
+        return
+    print(f"{n} cursor frames in {len(segs)} segments at {args.fps:.0f} fps")
+    print(f"{'filter':<36} {'lag_ms':>7} {'jitter_px':>10} {'err_px':>8}")
+    print(f"{'(raw target)':<36} {0.0:7.0f} {jitter([xy for _, xy in segs]):10.2f} {0.0:8.2f}")
+    for spec in args.filter or DEFAULT_SPECS:
+        outs = run_filter(spec, segs)
+        err = np.mean(np.concatenate([np.hypot(*(o - xy).T) for (_, xy), o in zip(segs, outs)]))
+        print(f"{spec:<36} {lag_ms(segs, outs):7.0f} {jitter(outs):10.2f} {err:8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+# event_bus.py
+# Bounded single-producer/single-consumer event rings between threads.
+#
+# Every producer thread (voice listener, command workers, the vision loop
+# itself) gets its own SpscRing the first time it publishes; the vision loop
+# is the only consumer and drain()s all rings once per frame without taking
+# a lock. In a ring only the producer writes tail and only the consumer
+# writes head, and each is a single attribute store, which is atomic under
+# the GIL - so neither side ever waits on the other. (Free-threaded builds
+# would need real atomics here.)
+#
+# Backpressure: a full ring rejects the event. publish(timeout=...) retries
+# until the consumer catches up (commands that must not be lost); UI messages
+# use timeout=0 and are counted as dropped instead. summary() reports queue
+# depth, drops and publish -> drain latency.
+#
+# Events are (kind, payload, t_publish) tuples; the kinds used by the
+# assistant are UI / STATE / MOUSE / GESTURE below.
+
+import time
+import threading
+from collections import deque
+
+CAPACITY = 256
+DRAIN_MAX = 64              # events handled per drain() (per frame)
+RETRY_S = 0.001
+
+UI = "ui"                   # (sender, text) chat line
+STATE = "state"             # (name, value), e.g. ("gestures", False)
+MOUSE = "mouse"             # action name, run on the vision thread
+GESTURE = "gesture"         # gesture name fired by the vision loop
+
+
+class SpscRing:
+    __slots__ = ("name", "_buf", "_cap", "_head", "_tail", "dropped", "max_depth")
+
+    def __init__(self, capacity=CAPACITY, name=""):
+        self.name = name
+        self._buf = [None] * capacity
+        self._cap = capacity
+        self._head = 0              # written by the consumer only
+        self._tail = 0              # written by the producer only
+        self.dropped = 0            # producer side
+        self.max_depth = 0          # consumer side
+
+    def push(self, item):
+        tail = self._tail
+        if tail - self._head >= self._cap:
+            return False
+        self._buf[tail % self._cap] = item
+        self._tail = tail + 1       # publish only after the slot is written
+        return True
+
+    def pop(self):
+        head = self._head
+        if head == self._tail:
+            return None
+        i = head % self._cap
+        item = self._buf[i]
+        self._buf[i] = None
+        self._head = head + 1
+        return item
+
+    def __len__(self):
+        return self._tail - self._head
+
+
+class EventBus:
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self._local = threading.local()
+        self._rings = ()            # replaced, never mutated: drain() iterates without a lock
+        self._lock = threading.Lock()
+        self.latency = deque(maxlen=1000)
+        self.drained = 0
+
+    def _ring(self):
+        ring = getattr(self._local, "ring", None)
+        if ring is None:
+            ring = SpscRing(self.capacity, threading.current_thread().name)
+            with self._lock:
+                self._rings = self._rings + (ring,)
+            self._local.ring = ring
+        return ring
+
+    def publish(self, kind, payload=None, timeout=0.0):
+        """Returns False if the event was dropped because the ring stayed full."""
+        ring = self._ring()
+        ev = (kind, payload, time.perf_counter())
+        if ring.push(ev):
+            return True
+        deadline = time.perf_counter() + timeout
+        while time.perf_counter() < deadline:
+            time.sleep(RETRY_S)
+            if ring.push(ev):
+                return True
+        ring.dropped += 1
+        return False
+
+    def drain(self, max_events=DRAIN_MAX):
+        """Consumer side: up to max_events (kind, payload) pairs, oldest ring first."""
+        out = []
+        now = time.perf_counter()
+        for ring in self._rings:
+            n = len(ring)
+            if n > ring.max_depth:
+                ring.max_depth = n
+            while len(out) < max_events:
+                ev = ring.pop()
+                if ev is None:
+                    break
+                self.latency.append(now - ev[2])
+                out.append((ev[0], ev[1]))
+        self.drained += len(out)
+        return out
+
+    def depth(self):
+        return sum(len(r) for r in self._rings)
+
+    def summary(self):
+        rings = self._rings
+        s = (f"bus      {self.drained} events  depth {self.depth()}  "
+             f"max {max((r.max_depth for r in rings), default=0)}/{self.capacity}  "
+             f"dropped {sum(r.dropped for r in rings)}")
+        if self.latency:
+            v = sorted(self.latency)
+            s += (f"  latency p50 {1000 * v[len(v) // 2]:.2f} ms  "
+                  f"p95 {1000 * v[min(len(v) - 1, int(len(v) * 0.95))]:.2f} ms  max {1000 * v[-1]:.2f} ms")
+        return s
@@ -0,0 +1,180 @@
+# extract_videos.py
+# Bulk landmark extraction from recorded videos into the gesture dataset.
+#
+# Layout: one sub-directory per label (videos/MOVE/*.mp4, videos/DRAG/...),
+# or a flat directory plus --label=NAME. Deeper folders are allowed and keep
+# the label of the top one (videos/DRAG/session1/a.mp4 is DRAG). Every video
+# is one job on a process pool; each worker builds its own MediaPipe Hands
+# instance once and reuses it for all the videos it gets (tracking state is
+# reset between videos). Workers only return landmark rows: this process is
+# the single dataset writer and stores every video as one session (source
+# "video:<content hash> <absolute path>"), the same way dataset.py imports
+# CSVs. Videos already in the dataset are recognised by their content, so
+# the same clip is skipped whatever root or path it is found under, and an
+# interrupted run can simply be started again.
+#
+# Landmarks are mirrored like collect_data.py does for the webcam preview;
+# pass --no-mirror for videos that were recorded already mirrored.
+#
+# Usage:
+#   python extract_videos.py videos/ [--workers=N] [--every=N] [--label=NAME] [--no-mirror]
+
+import os
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from dataset import GestureDataset
+
+VIDEO_EXT = (".mp4", ".avi", ".mov", ".mkv", ".webm", ".m4v")
+SOURCE_PREFIX = "video:"
+
+
+def video_key(path):
+    """Dedupe key of a video: "video:" plus a hash of its content."""
+    h = hashlib.blake2b(digest_size=8)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return SOURCE_PREFIX + h.hexdigest()
+
+
+def find_videos(root, label=None):
+    """[(path, label)] sorted; the label is the first directory under root unless given."""
+    jobs = []
+    for dirpath, _, files in os.walk(root):
+        rel = os.path.relpath(dirpath, root)
+        top = None if rel == os.curdir else rel.split(os.sep)[0]
+        for name in sorted(files):
+            if name.lower().endswith(VIDEO_EXT):
+                path = os.path.join(dirpath, name)
+                if label or top:
+                    jobs.append((path, label or top))
+                else:
+                    print(f"skipping {path}: not in a label directory (use --label=NAME)")
+    return sorted(jobs)
+
+
+# ================= WORKER =================
+# One Hands graph per process, created by the pool initializer.
+
+_hands = None
+_mirror = True
+
+
+def init_worker(mirror):
+    global _hands, _mirror
+    import mediapipe as mp
+    _hands = mp.solutions.hands.Hands(
+        max_num_hands=1,
+        min_detection_confidence=0.7,
+        min_tracking_confidence=0.7
+    )
+    _mirror = mirror
+
+
+def extract(path, label, every):
+    import cv2
+    from hand_frame import HandFrame
+    from frame_buffers import FrameSlot, mirror_hands
+
+    # a new video is not a continuation of the last one
+    if hasattr(_hands, "reset"):
+        _hands.reset()
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        return path, label, None, {"pid": os.getpid(), "frames": 0, "busy_s": 0.0, "error": "cannot open"}
+    slot = FrameSlot()      # reused BGR/RGB buffers
+    hf = HandFrame()
+    rows = []
+    frames = 0
+    t0 = time.perf_counter()
+    while True:
+        if frames % every:
+            ok = cap.grab()         # skipped frames are not decoded
+            frames += ok
+            if not ok:
+                break
+            continue
+        if not slot.read(cap):
+            break
+        frames += 1
+        res = _hands.process(slot.to_rgb())
+        if _mirror:
+            res = mirror_hands(res)
+        if res.multi_hand_landmarks:
+            rows.append(hf.load(res.multi_hand_landmarks[0]).xy.copy())
+    cap.release()
+    stats = {"pid": os.getpid(), "frames": frames, "processed": (frames + every - 1) // every,
+             "busy_s": time.perf_counter() - t0}
+    X = np.asarray(rows, np.float32).reshape(-1, 42)
+    return path, label, X, stats
+
+
+# ================= MAIN =================
+
+def main():
+    ap = argparse.ArgumentParser(description="Extract hand landmarks from videos into the gesture dataset")
+    ap.add_argument("root", help="video directory, one sub-directory per label")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="worker processes")
+    ap.add_argument("--every", type=int, default=1, help="process every N-th frame")
+    ap.add_argument("--label", help="label for all videos (flat directory)")
+    ap.add_argument("--no-mirror", action="store_true", help="videos were recorded already mirrored")
+    args = ap.parse_args()
+    root, workers, label = args.root, args.workers, args.label
+    every = max(1, args.every)
+    mirror = not args.no_mirror
+
+    ds = GestureDataset()
+    done = {s["source"].split(" ", 1)[0] for s in ds.meta["sessions"]}
+    videos = []
+    for path, lab in find_videos(root, label):
+        key = video_key(path)
+        if key in done:
+            print(f"already imported: {path}")
+        else:
+            done.add(key)
+            videos.append((path, lab, f"{key} {os.path.abspath(path)}"))
+    if not videos:
+        print("nothing to do")
+        return
+    print(f"{len(videos)} videos on {workers} workers (every {every} frame(s), mirror {mirror})")
+
+    per_worker = {}
+    total_frames = total_rows = 0
+    t_start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(mirror,)) as pool:
+        futures = {pool.submit(extract, path, lab, every): source for path, lab, source in videos}
+        for fut in as_completed(futures):
+            path, lab, X, st = fut.result()
+            if X is None:
+                print(f"  {path}: {st['error']}")
+                continue
+            with ds.begin_session(lab, source=futures[fut]) as s:
+                s.append(X)
+            w = per_worker.setdefault(st["pid"], {"videos": 0, "frames": 0, "processed": 0, "busy_s": 0.0})
+            w["videos"] += 1
+            w["frames"] += st["frames"]
+            w["processed"] += st["processed"]
+            w["busy_s"] += st["busy_s"]
+            total_frames += st["frames"]
+            total_rows += len(X)
+            fps = st["processed"] / max(st["busy_s"], 1e-9)
+            print(f"  {lab:<12} {len(X):6d} rows / {st['frames']:6d} frames  {fps:6.1f} fps  {path}")
+    wall = time.perf_counter() - t_start
+
+    print("---- workers ----")
+    for pid, w in sorted(per_worker.items()):
+        print(f"  pid {pid:<7} {w['videos']:4d} videos  {w['processed']:7d} frames  "
+              f"{w['processed'] / max(w['busy_s'], 1e-9):6.1f} fps  busy {w['busy_s']:.1f} s")
+    processed = sum(w["processed"] for w in per_worker.values())
+    print(f"overall  {processed} frames processed ({total_frames} read) in {wall:.1f} s = "
+          f"{processed / max(wall, 1e-9):.1f} fps, {total_rows} rows with a hand")
+    print(f"{ds.root}: {len(ds)} rows, {len(ds.meta['sessions'])} sessions")
+
+
+if __name__ == "__main__":
+    main()
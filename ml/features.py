@@ -0,0 +1,171 @@
+# features.py
+# Translation/scale-invariant hand features, shared by training and runtime.
+#
+# Input is the raw 42-value row collect_data.py stores (x0,y0,...,x20,y20 in
+# normalized image coordinates). The same pose near or far from the camera,
+# or in another corner of the image, gives (nearly) the same features:
+#   rel    20 landmarks relative to the wrist, divided by the palm size
+#          (wrist -> middle-finger MCP distance)                       40
+#   tips   distances between the 5 fingertips, / palm size              10
+#   angles bend of each finger joint, as the cosine between its bones 15
+#
+# transform() works on a whole (N, 42) batch with NumPy; the mouse loop runs
+# the very same function on a single row through FlatForest, so training and
+# runtime can never disagree. Bump SPEC["version"] whenever the math changes:
+# models record the spec they were trained with (model.feature_spec_) and a
+# mismatch refuses to load instead of silently mispredicting.
+#
+# cached_transform() stores feature matrices under gesture_data/feature_cache,
+# keyed by a hash of the source rows and the spec, so retraining on unchanged
+# data memory-maps the cached matrix instead of recomputing it.
+
+import os
+import json
+import hashlib
+
+import numpy as np
+
+from hand_frame import WRIST, PALM
+
+SPEC = {"name": "hand", "version": 1, "blocks": ["rel", "tips", "angles"]}
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gesture_data", "feature_cache")
+CACHE_KEEP = 4              # newest cached matrices kept per spec
+
+FINGERTIPS = np.array([4, 8, 12, 16, 20], np.intp)
+_PAIR_A, _PAIR_B = np.triu_indices(len(FINGERTIPS), k=1)
+# wrist -> MCP -> PIP -> DIP -> tip for each finger; one angle per middle joint
+_CHAINS = np.array([[WRIST, 1, 2, 3, 4], [WRIST, 5, 6, 7, 8], [WRIST, 9, 10, 11, 12],
+                    [WRIST, 13, 14, 15, 16], [WRIST, 17, 18, 19, 20]], np.intp)
+N_REL = 20
+N_TIPS = len(_PAIR_A)
+N_ANGLES = 3 * len(_CHAINS)
+N_RAW = 42
+N_FEATURES = 2 * N_REL + N_TIPS + N_ANGLES
+MIN_LEN = 1e-6
+
+# every landmark the tip/angle blocks need, gathered with one take() per axis:
+# [tip a | tip b | joint a | joint b | joint c]
+_GATHER = np.concatenate([FINGERTIPS[_PAIR_A], FINGERTIPS[_PAIR_B],
+                          _CHAINS[:, :-2].ravel(), _CHAINS[:, 1:-1].ravel(), _CHAINS[:, 2:].ravel()])
+_T = N_TIPS
+_J = N_ANGLES
+# float32 constants: Python floats cost an extra type resolution per ufunc call
+_ONE = np.float32(1.0)
+_MIN_LEN = np.float32(MIN_LEN)
+_MIN_LEN2 = np.float32(MIN_LEN * MIN_LEN)
+
+
+class HandFeatures:
+    """Feature extraction for batches of n rows with preallocated buffers.
+
+    The runtime keeps one HandFeatures(1) per model; transform() builds one
+    for the batch. Both run the same ufunc sequence, so a row gives the same
+    float32 features either way. x and y are processed together as (n, k, 2)
+    arrays to keep the number of NumPy calls per row low.
+    """
+
+    def __init__(self, n=1):
+        self.n = n
+        f32 = np.float32
+        k = len(_GATHER)
+        self.rel = np.empty((n, 21, 2), f32)
+        self.palm = np.empty((n, 1), f32)
+        self.inv = np.empty((n, 1, 1), f32)
+        self.g = np.empty((n, k, 2), f32)
+        self.d = np.empty((n, _T + 2 * _J, 2), f32)     # tip deltas, then bones u, v
+        self.len = np.empty((n, _T + 2 * _J), f32)
+        self.uv = np.empty((n, _J, 2), f32)
+        self.nn = np.empty((n, _J), f32)
+        self.out = np.empty((n, N_FEATURES), f32)
+        # fixed views, so a call slices nothing
+        self._rel_out = self.out[:, :2 * N_REL].reshape(n, N_REL, 2)
+        self._tips = self.out[:, 2 * N_REL:2 * N_REL + N_TIPS]
+        self._cos = self.out[:, 2 * N_REL + N_TIPS:]
+        self._palm_x, self._palm_y = self.rel[:, PALM:PALM + 1, 0], self.rel[:, PALM:PALM + 1, 1]
+        self._inv2 = self.inv[:, :, 0]
+        a, b = slice(0, _T), slice(_T, 2 * _T)
+        ja, jb, jc = (slice(2 * _T + i * _J, 2 * _T + (i + 1) * _J) for i in range(3))
+        u, v = slice(_T, _T + _J), slice(_T + _J, _T + 2 * _J)
+        self._diffs = [(self.g[:, p], self.g[:, q], self.d[:, r])
+                       for p, q, r in ((a, b, a), (ja, jb, u), (jc, jb, v))]
+        self._dx, self._dy = self.d[:, :, 0], self.d[:, :, 1]
+        self._u, self._v = self.d[:, u], self.d[:, v]
+        self._uvx, self._uvy = self.uv[:, :, 0], self.uv[:, :, 1]
+        self._len_tips = self.len[:, a]
+        self._len_u, self._len_v = self.len[:, u], self.len[:, v]
+
+    def __call__(self, X):
+        """(n, 42) raw rows -> (n, N_FEATURES) float32, in a reused buffer."""
+        P = np.asarray(X, np.float32).reshape(self.n, 21, 2)
+        inv = self.inv
+
+        # wrist-relative, palm-normalized coordinates
+        np.subtract(P, P[:, WRIST:WRIST + 1], out=self.rel)
+        np.hypot(self._palm_x, self._palm_y, out=self.palm)
+        np.maximum(self.palm, _MIN_LEN, out=self.palm)
+        np.divide(_ONE, self.palm, out=self._inv2)
+        np.multiply(self.rel[:, 1:], inv, out=self._rel_out)
+
+        # fingertip distances and bone vectors, from one gather
+        np.take(P, _GATHER, axis=1, out=self.g)
+        for p, q, r in self._diffs:
+            np.subtract(p, q, out=r)
+        np.hypot(self._dx, self._dy, out=self.len)
+        np.multiply(self._len_tips, self._inv2, out=self._tips)
+
+        # joint bend as the cosine between the two bones: -1 straight, 1 folded
+        # back (trees only compare thresholds, so cos carries the same
+        # information as the angle without an arccos per joint)
+        np.multiply(self._u, self._v, out=self.uv)
+        np.add(self._uvx, self._uvy, out=self._cos)
+        np.multiply(self._len_u, self._len_v, out=self.nn)
+        np.maximum(self.nn, _MIN_LEN2, out=self.nn)
+        np.divide(self._cos, self.nn, out=self._cos)
+        return self.out
+
+
+def transform(X):
+    """(N, 42) or (42,) raw rows -> new (N, N_FEATURES) float32 array."""
+    X = np.asarray(X, np.float32).reshape(-1, N_RAW)
+    return HandFeatures(len(X))(X)
+
+
+def check_spec(spec):
+    """Raises if a model's recorded spec is not the one this code computes."""
+    if spec is None:
+        return None
+    if spec.get("name") != SPEC["name"] or spec.get("version") != SPEC["version"]:
+        raise ValueError(f"model was trained with features {spec.get('name')} v{spec.get('version')}, "
+                         f"this code computes {SPEC['name']} v{SPEC['version']}: retrain with train_model.py")
+    return spec
+
+
+def data_key(X, spec=SPEC):
+    h = hashlib.blake2b(digest_size=12)
+    h.update(json.dumps(spec, sort_keys=True).encode())
+    h.update(str(np.shape(X)).encode())
+    h.update(np.ascontiguousarray(X, np.float32).data)
+    return h.hexdigest()
+
+
+def cached_transform(X, cache_dir=CACHE_DIR, verbose=True):
+    """transform(X) through the on-disk cache; returns a read-only memmap."""
+    prefix = f"{SPEC['name']}-v{SPEC['version']}-"
+    path = os.path.join(cache_dir, prefix + data_key(X) + ".npy")
+    if os.path.exists(path):
+        if verbose:
+            print(f"features: cache hit {os.path.basename(path)}")
+        return np.load(path, mmap_mode="r")
+    os.makedirs(cache_dir, exist_ok=True)
+    F = transform(X)
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, F)
+    os.replace(tmp, path)
+    old = sorted((p for p in os.listdir(cache_dir) if p.startswith(prefix) and p.endswith(".npy")),
+                 key=lambda p: os.path.getmtime(os.path.join(cache_dir, p)))
+    for p in old[:-CACHE_KEEP]:
+        os.remove(os.path.join(cache_dir, p))
+    if verbose:
+        print(f"features: computed {F.shape[0]} x {F.shape[1]} -> {os.path.basename(path)}")
+    return np.load(path, mmap_mode="r")
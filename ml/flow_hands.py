@@ -0,0 +1,141 @@
+# flow_hands.py
+# Sparse MediaPipe detection with optical-flow landmark tracking in between.
+#
+# Full hand-landmark inference runs only every FLOW_EVERY-th frame. On the
+# frames in between, the 21 landmarks of the last result are propagated with
+# pyramidal Lucas-Kanade (cv2.calcOpticalFlowPyrLK) on a small grayscale
+# copy of the frame. A drift check forces a detection on the same frame when
+#   - more than FLOW_MAX_LOST landmarks fail the forward-backward check,
+#   - the tracked hand grows/shrinks by more than FLOW_MAX_SCALE_CHANGE, or
+#   - the last detection's handedness score was below FLOW_MIN_SCORE.
+# FlowHands.process() is a drop-in for Hands.process() (and can wrap RoiHands;
+# its crop box is then moved along with the flow-tracked landmarks).
+
+import copy
+from collections import deque
+
+import cv2
+import numpy as np
+
+FLOW_EVERY = 3              # full inference every Nth frame
+FLOW_SCALE = 0.5            # flow runs on a grayscale frame downscaled by this
+FLOW_WIN = 15               # LK window (flow pixels)
+FLOW_LEVELS = 2             # pyramid levels above the base image
+FLOW_FB_MAX = 1.0           # forward-backward error (flow pixels) for a lost point
+FLOW_MAX_LOST = 4
+FLOW_MAX_SCALE_CHANGE = 0.25
+FLOW_MIN_SCORE = 0.8
+
+LK_PARAMS = dict(winSize=(FLOW_WIN, FLOW_WIN), maxLevel=FLOW_LEVELS,
+                 criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03))
+
+
+class FlowResult:
+    # same fields the scripts read from a MediaPipe result
+    __slots__ = ("multi_hand_landmarks", "multi_handedness")
+
+    def __init__(self, hand, handedness):
+        self.multi_hand_landmarks = [hand]
+        self.multi_handedness = handedness
+
+
+class FlowHands:
+    def __init__(self, hands, every=FLOW_EVERY, scale=FLOW_SCALE):
+        self.hands = hands
+        self.every = every
+        self.scale = scale
+        self.hand = None                    # landmark message of the last detection
+        self.handedness = None
+        self.pts = None                     # (21, 1, 2) float32 flow-pixel positions
+        self.span0 = 0.0                    # hand size at the last detection
+        self.age = 0                        # frames since the last detection
+        self._gray = None                   # full-size grayscale scratch
+        self._bufs = None                   # two small grayscale buffers (prev, cur)
+        self._cur = 0
+        self.detect_frames = 0
+        self.flow_frames = 0
+        self.forced = 0                     # detections forced by the drift check
+        self.fb_err = deque(maxlen=300)
+
+    def _small_gray(self, rgb):
+        H, W = rgb.shape[:2]
+        sw, sh = max(1, int(W * self.scale)), max(1, int(H * self.scale))
+        if self._gray is None or self._gray.shape != (H, W) or self._bufs[0].shape != (sh, sw):
+            # new frame size (e.g. a scheduler probe frame): restart tracking
+            self._gray = np.empty((H, W), np.uint8)
+            self._bufs = [np.empty((sh, sw), np.uint8), np.empty((sh, sw), np.uint8)]
+            self.hand = None
+        cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY, dst=self._gray)
+        self._cur ^= 1
+        small = self._bufs[self._cur]
+        cv2.resize(self._gray, (sw, sh), dst=small, interpolation=cv2.INTER_AREA)
+        return small
+
+    def process(self, rgb):
+        gray = self._small_gray(rgb)
+        if self.hand is not None and self.age + 1 < self.every:
+            res = self._track(self._bufs[self._cur ^ 1], gray)
+            if res is not None:
+                self.age += 1
+                self.flow_frames += 1
+                if hasattr(self.hands, "follow"):
+                    self.hands.follow(res, rgb.shape)
+                return res
+            self.forced += 1
+
+        res = self.hands.process(rgb)
+        self.detect_frames += 1
+        self._adopt(res, gray)
+        return res
+
+    def _adopt(self, res, gray):
+        self.age = 0
+        self.hand = None
+        if not res.multi_hand_landmarks:
+            return
+        if res.multi_handedness:
+            if res.multi_handedness[0].classification[0].score < FLOW_MIN_SCORE:
+                return
+        sh, sw = gray.shape
+        hand = res.multi_hand_landmarks[0]
+        self.pts = np.array([[(l.x * sw, l.y * sh)] for l in hand.landmark], np.float32)
+        self.span0 = float(np.ptp(self.pts[:, 0, :], axis=0).max())
+        self.hand = hand
+        self.handedness = res.multi_handedness
+
+    def _track(self, prev, gray):
+        p0 = self.pts
+        p1, st, _ = cv2.calcOpticalFlowPyrLK(prev, gray, p0, None, **LK_PARAMS)
+        back, st_b, _ = cv2.calcOpticalFlowPyrLK(gray, prev, p1, None, **LK_PARAMS)
+        fb = np.linalg.norm((back - p0)[:, 0, :], axis=1)
+        self.fb_err.append(float(np.median(fb)))
+        good = (st[:, 0] == 1) & (st_b[:, 0] == 1) & (fb < FLOW_FB_MAX)
+        if np.count_nonzero(~good) > FLOW_MAX_LOST:
+            return None
+        if not good.all():
+            # lost points (occluded fingertips etc.) follow the rest of the hand
+            shift = np.median((p1 - p0)[good], axis=0)
+            p1[~good] = p0[~good] + shift
+        span = float(np.ptp(p1[:, 0, :], axis=0).max())
+        if self.span0 > 0 and abs(span / self.span0 - 1.0) > FLOW_MAX_SCALE_CHANGE:
+            return None
+
+        self.pts = p1
+        sh, sw = gray.shape
+        # fresh message per frame: the previous result may still be in use downstream
+        hand = copy.deepcopy(self.hand)
+        for l, (x, y) in zip(hand.landmark, p1[:, 0, :]):
+            l.x = float(x) / sw
+            l.y = float(y) / sh
+        return FlowResult(hand, self.handedness)
+
+    def reset(self):
+        self.hand = None
+
+    def summary(self):
+        total = self.detect_frames + self.flow_frames
+        s = (f"flow     {self.flow_frames} of {total} frames tracked  "
+             f"detect {self.detect_frames}  forced {self.forced}")
+        if self.fb_err:
+            s += f"  fb err median {np.median(self.fb_err):.2f} px"
+        return s
@@ -0,0 +1,111 @@
+# forest_engine.py
+# Flattened tree-ensemble evaluator for gesture_model.pkl.
+# sklearn's predict() spends milliseconds in input validation and joblib
+# dispatch for a single 42-feature sample. Here every tree of the forest is
+# packed into contiguous NumPy node arrays; a sample resolves all split
+# decisions in one vectorized pass and then all trees are walked in
+# lock-step, one pointer lookup per tree level.
+# Models trained on features.py features (model.feature_spec_) take the raw
+# 42 landmark values here too; the features are computed in front of the trees.
+
+import os
+
+import numpy as np
+
+from features import HandFeatures, check_spec, transform
+
+MODEL_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "gesture_model.pkl")
+
+
+class FlatForest:
+    """Predictions identical to the sklearn forest/tree it was built from."""
+
+    def __init__(self, model):
+        trees = [e.tree_ for e in getattr(model, "estimators_", [model])]
+        self.classes_ = np.asarray(model.classes_)
+        self.n_features = int(model.n_features_in_)
+        self.feature_spec = check_spec(getattr(model, "feature_spec_", None))
+        self._features = HandFeatures(1) if self.feature_spec else None
+        self.n_trees = len(trees)
+
+        sizes = [t.node_count for t in trees]
+        offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]]).astype(np.intp)
+        n_nodes = int(sum(sizes))
+
+        self.feature = np.zeros(n_nodes, np.intp)
+        self.threshold = np.zeros(n_nodes, np.float64)
+        # children[2*i] is the left child (x <= thr), children[2*i+1] the right one
+        self.children = np.zeros(2 * n_nodes, np.intp)
+        self.value = np.zeros((n_nodes, len(self.classes_)), np.float64)
+        self.depth = 0
+
+        for t, off in zip(trees, offsets):
+            sl = slice(off, off + t.node_count)
+            ids = np.arange(off, off + t.node_count)
+            leaf = t.children_left == -1
+            self.feature[sl] = np.where(leaf, 0, t.feature)
+            self.threshold[sl] = np.where(leaf, np.inf, t.threshold)
+            # leaves point at themselves so extra levels are no-ops
+            self.children[2 * off:2 * (off + t.node_count):2] = np.where(leaf, ids, t.children_left + off)
+            self.children[2 * off + 1:2 * (off + t.node_count):2] = np.where(leaf, ids, t.children_right + off)
+            val = t.value[:, 0, :]
+            norm = val.sum(axis=1, keepdims=True)
+            if not np.allclose(norm, 1.0):
+                # sklearn < 1.4 stored class counts and normalized in predict_proba
+                norm[norm == 0.0] = 1.0
+                val = val / norm
+            self.value[sl] = val
+            self.depth = max(self.depth, int(t.max_depth))
+
+        self.roots = offsets
+        self.left = self.children[0::2].copy()
+        self.right = self.children[1::2].copy()
+        # scratch buffers for predict_one
+        self._x = np.zeros(self.n_features, np.float64)
+        self._xn = np.zeros(n_nodes, np.float64)
+        self._go_right = np.zeros(n_nodes, bool)
+        self._next = np.zeros(n_nodes, np.intp)
+        self._idx = np.zeros(self.n_trees, np.intp)
+        self._leaf_val = np.zeros((self.n_trees, len(self.classes_)), np.float64)
+        self._acc = np.zeros((self.n_trees, len(self.classes_)), np.float64)
+
+    def predict_proba_one(self, x):
+        if self._features is not None:
+            x = self._features(x)[0]
+        # sklearn casts X to float32 before comparing against float64 thresholds
+        np.copyto(self._x, np.asarray(x, np.float32), casting="safe")
+        # decide every split of every tree at once, then just follow pointers
+        np.take(self._x, self.feature, out=self._xn)
+        np.greater(self._xn, self.threshold, out=self._go_right)
+        np.copyto(self._next, self.left)
+        np.copyto(self._next, self.right, where=self._go_right)
+        idx = self._idx
+        idx[:] = self.roots
+        for _ in range(self.depth):
+            np.take(self._next, idx, out=idx)
+        np.take(self.value, idx, axis=0, out=self._leaf_val)
+        # tree-by-tree running sum, same summation order as sklearn
+        np.cumsum(self._leaf_val, axis=0, out=self._acc)
+        return self._acc[-1] / self.n_trees
+
+    def predict_one(self, x):
+        return self.classes_[int(np.argmax(self.predict_proba_one(x)))]
+
+    def predict_proba(self, X):
+        if self.feature_spec:
+            X = transform(X)
+        X = np.asarray(X, np.float32).astype(np.float64)
+        rows = np.arange(len(X))[:, None]
+        idx = np.broadcast_to(self.roots, (len(X), self.n_trees)).copy()
+        for _ in range(self.depth):
+            right = X[rows, self.feature[idx]] > self.threshold[idx]
+            idx = self.children[2 * idx + right]
+        return np.cumsum(self.value[idx], axis=1)[:, -1] / self.n_trees
+
+    def predict(self, X):
+        return self.classes_.take(np.argmax(self.predict_proba(X), axis=1))
+
+
+def load_forest(path=MODEL_PATH):
+    import joblib
+    return FlatForest(joblib.load(path))
@@ -0,0 +1,144 @@
+# frame_buffers.py
+# Preallocated frame buffers for the camera loops, plus memory statistics.
+#
+# FrameSlot owns the three per-frame images (camera BGR, RGB for MediaPipe,
+# mirrored preview) and every OpenCV call writes into them with dst=, so a
+# steady-state frame allocates no image memory. The camera image is never
+# flipped for inference: MediaPipe runs on the raw frame and mirror_hands()
+# flips the landmarks instead (x -> 1 - x), which gives the same coordinates
+# the old flip-then-detect code produced. Only the preview is flipped, into
+# its own buffer. (MediaPipe's Left/Right handedness label is swapped on the
+# unflipped image; nothing here uses it.)
+#
+# FramePool hands out slots to the threaded pipeline and takes them back once
+# a packet has been displayed or dropped. MemStats reports allocations per
+# frame, GC collections and resident memory over a run (--trace-alloc turns
+# on tracemalloc for per-frame allocated bytes).
+
+import os
+import sys
+import gc
+import time
+import queue
+from collections import deque
+
+import cv2
+
+
+class FrameSlot:
+    __slots__ = ("bgr", "rgb", "view")
+
+    def __init__(self):
+        self.bgr = self.rgb = self.view = None
+
+    def read(self, cap):
+        # cap.read() reuses the array it is given when the size matches
+        ok, img = cap.read() if self.bgr is None else cap.read(self.bgr)
+        if ok:
+            self.bgr = img
+        return ok
+
+    def to_rgb(self):
+        if self.rgb is None or self.rgb.shape != self.bgr.shape:
+            self.rgb = cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB)
+        else:
+            cv2.cvtColor(self.bgr, cv2.COLOR_BGR2RGB, dst=self.rgb)
+        return self.rgb
+
+    def preview(self):
+        # mirrored copy for display and overlays
+        if self.view is None or self.view.shape != self.bgr.shape:
+            self.view = cv2.flip(self.bgr, 1)
+        else:
+            cv2.flip(self.bgr, 1, dst=self.view)
+        return self.view
+
+
+def mirror_hands(res):
+    """Flip landmarks of a result computed on the unflipped frame, in place."""
+    if res.multi_hand_landmarks:
+        for hand in res.multi_hand_landmarks:
+            for l in hand.landmark:
+                l.x = 1.0 - l.x
+    return res
+
+
+class FramePool:
+    def __init__(self, size=4):
+        self._free = queue.SimpleQueue()
+        for _ in range(size):
+            self._free.put(FrameSlot())
+        self.size = size
+        self.grown = 0          # slots allocated because every slot was in flight
+
+    def acquire(self):
+        try:
+            return self._free.get_nowait()
+        except queue.Empty:
+            self.grown += 1
+            self.size += 1
+            return FrameSlot()
+
+    def release(self, slot):
+        if slot is not None:
+            self._free.put(slot)
+
+
+def rss_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        return 0
+
+
+class MemStats:
+    """Call tick() once per frame."""
+
+    def __init__(self, trace=None, rss_every=1.0):
+        self.trace = ("--trace-alloc" in sys.argv) if trace is None else trace
+        if self.trace:
+            import tracemalloc
+            self._tm = tracemalloc
+            tracemalloc.start()
+            self._cur = tracemalloc.get_traced_memory()[0]
+        self.rss_every = rss_every
+        self.frames = 0
+        self.alloc = deque(maxlen=1000)     # bytes allocated during each frame
+        self._blocks0 = sys.getallocatedblocks()
+        self._gc0 = [s["collections"] for s in gc.get_stats()]
+        self._t0 = self._t_rss = time.perf_counter()
+        self.rss0 = self.rss = self.rss_max = rss_bytes()
+
+    def tick(self):
+        self.frames += 1
+        if self.trace:
+            cur, peak = self._tm.get_traced_memory()
+            self.alloc.append(max(0, peak - self._cur))
+            self._tm.reset_peak()
+            self._cur = cur
+        now = time.perf_counter()
+        if now - self._t_rss >= self.rss_every:
+            self._t_rss = now
+            self.rss = rss_bytes()
+            self.rss_max = max(self.rss_max, self.rss)
+
+    def summary(self):
+        n = max(self.frames, 1)
+        mins = max(time.perf_counter() - self._t0, 1e-9) / 60.0
+        gcs = [s["collections"] - c0 for s, c0 in zip(gc.get_stats(), self._gc0)]
+        mb = 1.0 / (1024 * 1024)
+        s = (f"mem      rss {self.rss * mb:.1f} MB (start {self.rss0 * mb:.1f}  max {self.rss_max * mb:.1f}  "
+             f"{(self.rss - self.rss0) * mb / mins:+.2f} MB/min)  "
+             f"net blocks/frame {(sys.getallocatedblocks() - self._blocks0) / n:+.2f}  "
+             f"gc/1k frames {'/'.join(f'{1000 * g / n:.1f}' for g in gcs)}")
+        if self.alloc:
+            a = sorted(self.alloc)
+            s += (f"\n  alloc/frame avg {sum(a) / len(a) / 1024:.1f} KB  "
+                  f"p95 {a[min(len(a) - 1, int(len(a) * 0.95))] / 1024:.1f} KB  max {a[-1] / 1024:.1f} KB")
+        return s
@@ -0,0 +1,428 @@
+# gesture_engine.py
+# Per-frame gesture -> mouse decision logic, independent of camera and display.
+# HandMouseEngine is the calibrated engine behind inference_mouse.py,
+# BasicMouseEngine the hard-freeze state machine of src/v1_basic_mouse.py.
+# Clicks, drags and state changes are rows of gesture_fsm tables with hold
+# times in ms, so `now` must be a monotonic clock in seconds.
+# Both drive a pointer.py backend (moveTo, click, rightClick, scroll,
+# mouseDown, mouseUp, flush), so a real pointer or the in-memory fake used by
+# replay.py can be plugged in.
+
+import math
+import time
+
+import numpy as np
+
+from window_stats import SlidingQuantile, AnchorFilter
+from hand_frame import INDEX_TIP, MIDDLE_TIP
+from cursor_filter import EmaFilter
+from gesture_fsm import GestureMachine, ANY
+
+# ----------------- CALIBRATED TUNABLES -----------------
+# VERY CLOSE threshold (calibrated from user's photo at /mnt/data/WIN_20251119_15_19_24_Pro.jpg)
+CURSOR_GAP_VERY_CLOSE = 0.035
+ # normalized (0..1). Lower = stricter; increase if cursor never activates.
+
+# Cursor movement (default filter; see cursor_filter.py for oneeuro/kalman)
+SMOOTH_ALPHA = 0.12
+DEADZONE_PIX = 6
+CURSOR_FILTER = "ema"
+CURSOR_FILTER_PARAMS = {"alpha": SMOOTH_ALPHA, "deadzone": DEADZONE_PIX}
+
+# Adaptive mapping
+HIST_LEN = 450
+MIN_CALIB = 16
+LOW_PER = 4
+HIGH_PER = 96
+EXPAND_BOX = 0.90
+EDGE_POWER = 1.03
+
+# Click/drag/scroll tuning (hold = how long the pose must be held)
+INDEX_FOLD_HOLD_MS = 60         # was 3 frames
+INDEX_FOLD_DEBOUNCE_MS = 200
+RIGHT_FOLD_HOLD_MS = 60         # was 3 frames
+RIGHT_CLICK_DEBOUNCE_MS = 450
+
+SCROLL_MIN_DELTA = 0.004
+SCROLL_SENS = 300
+
+DRAG_HOLD_MS = 150              # was 6 frames
+DRAG_SMOOTH = 0.03     # very slow anchor update for pixel-perfect drag (per REF_FPS frame)
+DRAG_SMOOTH_FAR = 0.35 # follow rate once the cursor lags the hand by DRAG_FAR or more
+DRAG_FAR = 0.05        # lag (fraction of the screen) where the fast rate takes over
+DRAG_MAX_SPEED = 1.5   # screen widths/s (was DRAG_MAX_STEP = 2 px per frame)
+REF_FPS = 30.0         # frame rate the per-frame constants were tuned at
+
+ANCHOR_HIST_LEN = 12
+ANCHOR_JUMP_THRESH = 0.06
+ANCHOR_STABLE_REQ = 2
+
+FIST_TIP_PALM = 0.11
+# ------------------------------------------------------
+
+
+FREE = "FREE"
+DRAGGING = "DRAGGING"
+
+# name          from      to        hold_ms             cooldown_ms
+HAND_GESTURES = [
+    ("LEFT_CLICK",  FREE,     None,     INDEX_FOLD_HOLD_MS, INDEX_FOLD_DEBOUNCE_MS),
+    ("RIGHT_CLICK", FREE,     None,     RIGHT_FOLD_HOLD_MS, RIGHT_CLICK_DEBOUNCE_MS),
+    ("SCROLL",      ANY,      None,     0,                  0),
+    ("DRAG_START",  FREE,     DRAGGING, DRAG_HOLD_MS,       0),
+    ("DROP",        DRAGGING, FREE,     0,                  0),
+]
+
+
+def remap_edge(v, lo, hi, p):
+    if hi - lo == 0:
+        t = 0.5
+    else:
+        t = (v - lo) / (hi - lo)
+    t = max(0.0, min(1.0, t))
+    t0 = 2 * (t - 0.5)
+    t1 = np.sign(t0) * (abs(t0) ** p)
+    return float((t1 + 1) / 2)
+
+
+class HandMouseEngine:
+    """Calibrated A-strict hand mouse. Call step() once per camera frame."""
+
+    def __init__(self, mouse, screen_w, screen_h, forest=None, sleep=time.sleep,
+                 cursor_filter=None):
+        self.mouse = mouse
+        self.screen_w, self.screen_h = screen_w, screen_h
+        self.forest = forest
+        self.ml_mode = False
+        self.ml_label = ""
+        self.sleep = sleep
+
+        self.cursor_filter = cursor_filter or EmaFilter(SMOOTH_ALPHA, DEADZONE_PIX)
+        self.cursor_filter.reset(screen_w / 2.0, screen_h / 2.0)
+        self.hist_x = SlidingQuantile(HIST_LEN)
+        self.hist_y = SlidingQuantile(HIST_LEN)
+        self.anchor_filter = AnchorFilter(ANCHOR_HIST_LEN, ANCHOR_JUMP_THRESH, ANCHOR_STABLE_REQ)
+
+        self.drag_locked_pos = None
+        self.drag_prev_raw = None
+        self.drag_just_started = False
+        self.last_t = None
+        self.scroll_anchor_y = None
+
+        self.fsm = GestureMachine(HAND_GESTURES, FREE, {
+            "LEFT_CLICK": self._left_click,
+            "RIGHT_CLICK": self._right_click,
+            "SCROLL": self._scroll,
+            "DRAG_START": self._drag_start,
+            "DROP": self._drop,
+        })
+        self._hf = None
+        self._eff = (0.0, 0.0)
+        self._text = ""
+
+        # per-frame outputs for the UI
+        self.cursor_active = False
+        self.moved = False
+        self.fired = ()         # gesture rows that fired this step
+        self.ax = self.ay = 0.0
+        self.target = None      # unfiltered screen target while the cursor is active
+
+    @property
+    def is_dragging(self):
+        return self.fsm.state == DRAGGING
+
+    def step(self, hf, now):
+        """hf: loaded HandFrame, or None when no hand is visible. Returns gesture text."""
+        self.cursor_active = False
+        self.moved = False
+        self.fired = ()
+        self.target = None
+        # frame interval for the time-based drag limits (nominal on the first frame)
+        dt = 1.0 / REF_FPS if self.last_t is None else min(max(now - self.last_t, 0.0), 0.1)
+        self.last_t = now
+        if hf is None:
+            self._no_hand()
+            return ""
+
+        mouse = self.mouse
+        screen_w, screen_h = self.screen_w, self.screen_h
+
+        # finger states
+        index_up = hf.index_up
+        middle_up = hf.middle_up
+
+        # A strict rule: very close required
+        fingers_close = hf.index_middle_dist < CURSOR_GAP_VERY_CLOSE
+
+        # cursor allowed posture
+        cursor_allowed = index_up and middle_up and hf.ring_fold and hf.pinky_fold and fingers_close
+
+        # midpoint anchor
+        ix, iy = hf.point(INDEX_TIP)
+        mx, my = hf.point(MIDDLE_TIP)
+        ax = (ix + mx) / 2.0
+        ay = (iy + my) / 2.0
+        self.ax, self.ay = ax, ay
+
+        # build history (only when both extended)
+        if index_up and middle_up:
+            self.hist_x.append(ax); self.hist_y.append(ay)
+
+        # adaptive mapping
+        if len(self.hist_x) >= MIN_CALIB:
+            lo_x = self.hist_x.percentile(LOW_PER)
+            hi_x = self.hist_x.percentile(HIGH_PER)
+            lo_y = self.hist_y.percentile(LOW_PER)
+            hi_y = self.hist_y.percentile(HIGH_PER)
+
+            lo_x = max(0.0, lo_x - EXPAND_BOX)
+            hi_x = min(1.0, hi_x + EXPAND_BOX)
+            lo_y = max(0.0, lo_y - EXPAND_BOX)
+            hi_y = min(1.0, hi_y + EXPAND_BOX)
+
+            # safety widen if too narrow
+            if hi_x - lo_x < 0.02:
+                lo_x = max(0, lo_x - 0.05); hi_x = min(1, hi_x + 0.05)
+            if hi_y - lo_y < 0.02:
+                lo_y = max(0, lo_y - 0.05); hi_y = min(1, hi_y + 0.05)
+
+            sx = remap_edge(ax, lo_x, hi_x, EDGE_POWER)
+            sy = remap_edge(ay, lo_y, hi_y, EDGE_POWER)
+        else:
+            sx = remap_edge(ax, 0.15, 0.85, EDGE_POWER)
+            sy = remap_edge(ay, 0.15, 0.85, EDGE_POWER)
+
+        target_x = sx * screen_w
+        target_y = sy * screen_h
+
+        # anchor median + jump filter (for drag)
+        eff_ax, eff_ay = self.anchor_filter.update(ax, ay)
+
+        # fist detection
+        is_fist = hf.is_fist(FIST_TIP_PALM)
+
+        open_hand = hf.all_up
+
+        # click postures
+        left_pose = (not index_up) and middle_up
+        right_pose = (not middle_up) and index_up
+
+        if self.ml_mode and self.forest is not None:
+            self.ml_label = self.forest.predict_one(hf.xy)
+            cursor_allowed = self.ml_label == "MOVE"
+            left_pose = self.ml_label == "LEFT_CLICK"
+            right_pose = self.ml_label == "RIGHT_CLICK"
+            is_fist = self.ml_label == "DRAG"
+
+        # ---------- Cursor movement ----------
+        if not self.is_dragging:
+            if cursor_allowed:
+                self.cursor_active = True
+                self.target = (target_x, target_y)
+                smooth_x, smooth_y, move = self.cursor_filter.step(target_x, target_y, now)
+                if move:
+                    mouse.moveTo(int(smooth_x), int(smooth_y))
+                    self.moved = True
+        else:
+            # DRAG MODE — very slow precise follow of anchor (eff_ax/eff_ay)
+            raw_x = eff_ax * screen_w
+            raw_y = eff_ay * screen_h
+
+            if self.drag_just_started and self.drag_locked_pos is None:
+                self.drag_locked_pos = [raw_x, raw_y]
+                self.drag_just_started = False
+
+            lx, ly = self.drag_locked_pos
+            dx = raw_x - lx; dy = raw_y - ly
+
+            # same follow rate and speed limit at any camera frame rate; the
+            # rate rises from DRAG_SMOOTH (fine placement) to DRAG_SMOOTH_FAR
+            # as the cursor falls behind the hand, so long drags keep up
+            k = dt * REF_FPS
+            lag = min(1.0, math.hypot(dx/screen_w, dy/screen_h) / DRAG_FAR)
+            rate = DRAG_SMOOTH + (DRAG_SMOOTH_FAR - DRAG_SMOOTH) * lag * lag
+            smooth = 1.0 - (1.0 - rate) ** k
+            max_step = DRAG_MAX_SPEED * screen_w * dt
+
+            # an anchor jump between two frames is a tracking glitch: hold
+            prev, self.drag_prev_raw = self.drag_prev_raw, (raw_x, raw_y)
+            if prev is not None and math.hypot((raw_x - prev[0])/screen_w,
+                                               (raw_y - prev[1])/screen_h) > ANCHOR_JUMP_THRESH * k:
+                new_x, new_y = lx, ly
+            else:
+                new_x = lx + dx * smooth
+                new_y = ly + dy * smooth
+
+            if abs(new_x - lx) > max_step:
+                new_x = lx + math.copysign(max_step, new_x - lx)
+            if abs(new_y - ly) > max_step:
+                new_y = ly + math.copysign(max_step, new_y - ly)
+
+            mouse.moveTo(int(new_x), int(new_y))
+            self.moved = True
+            self.drag_locked_pos = [new_x, new_y]
+            self.cursor_filter.reset(new_x, new_y)
+
+        # ---------- CLICKS / SCROLL / DRAG ----------
+        if not hf.all_up:
+            self.scroll_anchor_y = None
+        self._hf, self._eff, self._text = hf, (eff_ax, eff_ay), ""
+        self.fired = self.fsm.step({
+            "LEFT_CLICK": left_pose,
+            "RIGHT_CLICK": right_pose,
+            "SCROLL": hf.all_up,
+            "DRAG_START": is_fist,
+            "DROP": open_hand,
+        }, now)
+        return self._text
+
+    def _left_click(self):
+        self.mouse.click()
+        self._text = "LEFT CLICK"
+
+    def _right_click(self):
+        self.mouse.rightClick()
+        self._text = "RIGHT CLICK"
+
+    def _scroll(self):
+        # four fingers up: scroll by the drift of the fingertip line
+        cur_avg_y = self._hf.tip_y_mean
+        if self.scroll_anchor_y is None:
+            self.scroll_anchor_y = cur_avg_y
+            return
+        dy_norm = self.scroll_anchor_y - cur_avg_y
+        if abs(dy_norm) > SCROLL_MIN_DELTA:
+            self.mouse.scroll(int(dy_norm * SCROLL_SENS))
+            self._text = "SCROLL"
+        self.scroll_anchor_y = self.scroll_anchor_y * 0.85 + cur_avg_y * 0.15
+
+    def _drag_start(self):
+        mouse = self.mouse
+        snap_x = int(self._eff[0] * self.screen_w)
+        snap_y = int(self._eff[1] * self.screen_h)
+        mouse.moveTo(snap_x, snap_y)
+        mouse.flush()
+        self.moved = True
+        self.sleep(0.03)
+        mouse.mouseDown()
+        self.drag_just_started = True
+        self.drag_locked_pos = [snap_x, snap_y]
+        self.drag_prev_raw = None
+        self._text = "DRAG START"
+
+    def _drop(self):
+        self.mouse.mouseUp()
+        self.drag_locked_pos = None
+        self.drag_prev_raw = None
+        self._text = "DROP"
+
+    def _no_hand(self):
+        # no hand -> safe cleanup / release drag
+        self.scroll_anchor_y = None
+        self.ml_label = ""
+        self.drag_just_started = False
+        self.anchor_filter.clear()
+        self.fsm.reset_holds()
+        if self.is_dragging:
+            self.mouse.mouseUp()
+            self.fsm.state = FREE
+            self.drag_locked_pos = None
+            self.drag_prev_raw = None
+
+
+# ================= v1 HARD FREEZE ENGINE =================
+V1_SMOOTH_ALPHA = 0.2
+V1_DEADZONE = 12
+V1_CURSOR_FILTER_PARAMS = {"alpha": V1_SMOOTH_ALPHA, "deadzone": V1_DEADZONE, "gate": "target"}
+V1_CLICK_COOLDOWN_MS = 600
+
+MOVE = "MOVE"
+LEFT_LOCK = "LEFT_LOCK"
+RIGHT_LOCK = "RIGHT_LOCK"
+DRAG_LOCK = "DRAG_LOCK"
+
+# name          from                     to          hold_ms  cooldown_ms           group
+V1_GESTURES = [
+    ("LEFT_CLICK",  MOVE,                    LEFT_LOCK,  0,       V1_CLICK_COOLDOWN_MS, "click"),
+    ("RIGHT_CLICK", MOVE,                    RIGHT_LOCK, 0,       V1_CLICK_COOLDOWN_MS, "click"),
+    ("RELEASE",     (LEFT_LOCK, RIGHT_LOCK), MOVE,       0,       0),
+    ("DRAG",        MOVE,                    DRAG_LOCK,  0,       0),
+    ("DROP",        DRAG_LOCK,               MOVE,       0,       0),
+]
+
+
+class BasicMouseEngine:
+    """src/v1_basic_mouse.py state machine: the cursor is frozen while a click/drag is held."""
+
+    def __init__(self, mouse, screen_w, screen_h, cursor_filter=None):
+        self.mouse = mouse
+        self.screen_w, self.screen_h = screen_w, screen_h
+        self.fsm = GestureMachine(V1_GESTURES, MOVE, {
+            "LEFT_CLICK": self._left_click,
+            "RIGHT_CLICK": self._right_click,
+            "DRAG": self._drag,
+            "DROP": mouse.mouseUp,
+        })
+        # HARD cursor anchor (absolute lock)
+        self.cursor_x = screen_w // 2
+        self.cursor_y = screen_h // 2
+        self.cursor_filter = cursor_filter or EmaFilter(**V1_CURSOR_FILTER_PARAMS)
+        self.cursor_filter.reset(self.cursor_x, self.cursor_y)
+        self.moved = False
+        self.fired = ()
+        self.target = None
+
+    @property
+    def state(self):
+        return self.fsm.state
+
+    def _left_click(self):
+        self.mouse.moveTo(self.cursor_x, self.cursor_y)
+        self.mouse.click()
+
+    def _right_click(self):
+        self.mouse.moveTo(self.cursor_x, self.cursor_y)
+        self.mouse.rightClick()
+
+    def _drag(self):
+        self.mouse.moveTo(self.cursor_x, self.cursor_y)
+        self.mouse.mouseDown()
+
+    def step(self, hf, now):
+        self.moved = False
+        self.fired = ()
+        self.target = None
+        if hf is None:
+            return self.state
+
+        mouse = self.mouse
+        index_open = hf.index_up
+        middle_open = hf.middle_up
+
+        # LEFT/RIGHT CLICK = index/middle folded, DRAG = fist, DROP = open hand
+        self.fired = self.fsm.step({
+            "LEFT_CLICK": not index_open and middle_open,
+            "RIGHT_CLICK": index_open and not middle_open,
+            "RELEASE": index_open and middle_open,
+            "DRAG": hf.all_fold,
+            "DROP": hf.all_up,
+        }, now)
+
+        # ================= MOVE (ONLY HERE) =================
+        if self.state == MOVE and index_open and middle_open:
+            ix, iy = hf.point(INDEX_TIP)
+            ix *= self.screen_w
+            iy *= self.screen_h
+            self.target = (ix, iy)
+
+            x, y, move = self.cursor_filter.step(ix, iy, now)
+            if move:
+                self.cursor_x, self.cursor_y = x, y
+                mouse.moveTo(self.cursor_x, self.cursor_y)
+                self.moved = True
+
+        # ================= HARD LOCK ENFORCEMENT =================
+        if self.state in [LEFT_LOCK, RIGHT_LOCK, DRAG_LOCK]:
+            mouse.moveTo(self.cursor_x, self.cursor_y)
+
+        return self.state
@@ -0,0 +1,86 @@
+# gesture_fsm.py
+# Table-driven gesture state machine on monotonic timestamps.
+#
+# A table row is
+#   (name, from_states, to_state, hold_ms, cooldown_ms[, cooldown_group])
+#
+# A row fires once its condition has been true for hold_ms (measured on the
+# caller's clock, not in frames) while the machine is in one of from_states
+# (ANY = every state), and at least cooldown_ms have passed since the last
+# firing of its cooldown group (default: the row itself). Firing moves to
+# to_state (None = stay), runs the row's action and restarts its hold, so a
+# held pose repeats every hold_ms once the cooldown allows it.
+#
+# Rows are evaluated top to bottom once per step(); each row sees the state
+# left by the rows above it, so the table order is the priority order.
+
+from collections import deque
+
+ANY = "*"
+
+
+class Rule:
+    __slots__ = ("name", "src", "dst", "hold", "cooldown", "group", "since", "onset")
+
+    def __init__(self, name, src, dst, hold_ms, cooldown_ms, group=None):
+        self.name = name
+        self.src = (src,) if isinstance(src, str) else tuple(src)
+        self.dst = dst
+        self.hold = hold_ms / 1000.0
+        self.cooldown = cooldown_ms / 1000.0
+        self.group = group or name
+        self.since = None           # start of the current hold (restarts after firing)
+        self.onset = None           # when the pose started, until it is released
+
+    def applies(self, state):
+        return ANY in self.src or state in self.src
+
+
+class GestureMachine:
+    def __init__(self, table, initial, actions=None):
+        self.rules = [Rule(*row) for row in table]
+        self.state = initial
+        self.actions = actions or {}
+        self.last_fire = {r.group: float("-inf") for r in self.rules}
+        # pose onset -> first fire delay per gesture (seconds), for replay reports
+        self.latency = {r.name: deque(maxlen=1000) for r in self.rules}
+
+    def step(self, active, now):
+        """active: {name: bool} conditions for this frame. Returns fired names in order."""
+        fired = []
+        for r in self.rules:
+            if not r.applies(self.state) or not active.get(r.name):
+                r.since = r.onset = None
+                continue
+            if r.since is None:
+                r.since = now
+            if r.onset is None:
+                r.onset = now
+            if now - r.since < r.hold or now - self.last_fire[r.group] <= r.cooldown:
+                continue
+            if r.onset is not False:
+                self.latency[r.name].append(now - r.onset)
+                r.onset = False     # repeats while held are not onset latency
+            r.since = None
+            self.last_fire[r.group] = now
+            if r.dst is not None:
+                self.state = r.dst
+            fired.append(r.name)
+            action = self.actions.get(r.name)
+            if action is not None:
+                action()
+        return fired
+
+    def reset_holds(self):
+        # e.g. the hand left the frame: every pose has to be held again
+        for r in self.rules:
+            r.since = r.onset = None
+
+    def summary(self):
+        parts = []
+        for name, lat in self.latency.items():
+            if lat:
+                s = sorted(lat)
+                parts.append(f"{name} {len(s)}x p50 {1000 * s[len(s) // 2]:.0f} "
+                             f"max {1000 * s[-1]:.0f} ms")
+        return "gesture latency  " + ("  ".join(parts) if parts else "-")
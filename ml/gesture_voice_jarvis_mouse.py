@@ -5,40 +5,169 @@ import speech_recognition as sr
 import threading
 import time
 import webbrowser
-import os
+import subprocess
 import winsound
+from urllib.parse import quote_plus
 from collections import deque
 
+from hand_frame import HandFrame, INDEX_TIP
+from pointer import pointer_from_argv
+from scheduler import AdaptiveScheduler
+from frame_buffers import FrameSlot, MemStats, mirror_hands
+import voice
+from commands import CommandRegistry
+from event_bus import EventBus, UI, STATE, MOUSE, GESTURE
+from preview import OverlayLayer, preview_from_argv
+from telemetry import telemetry_from_argv
+
 # ================= BASIC SETUP =================
 pyautogui.FAILSAFE = False
-screen_w, screen_h = pyautogui.size()
+pointer = pointer_from_argv()
+screen_w, screen_h = pointer.size()
 
-running = True
-gesture_enabled = True
-listening_enabled = True
 wake_word = "alpha"
 
-# Chat buffer
-chat = deque(maxlen=10)
+# Voice thread / command workers -> vision loop (see event_bus.py). The vision
+# loop owns the chat and the gesture/listening state and performs every mouse
+# action; other threads only publish events. stopped/listening mirror that
+# state back to the voice thread.
+bus = EventBus()
+stopped = threading.Event()
+listening = threading.Event()
+listening.set()
+COMMAND_TIMEOUT_S = 0.5     # a full bus delays a command instead of losing it
+SCROLL_NOTCHES = 5
 
 def add_msg(sender, text):
-    chat.append(f"{sender}: {text}")
+    bus.publish(UI, (sender, text))
+
+def send(kind, payload):
+    if not bus.publish(kind, payload, timeout=COMMAND_TIMEOUT_S):
+        print(f"event bus full, dropped {kind} {payload}")
 
 add_msg("SYSTEM", "Say 'alpha' + command (say 'alpha help')")
 
 # ================= VOICE SETUP =================
-recognizer = sr.Recognizer()
-microphone = sr.Microphone()
+# Offline (voice.py: local VAD + vosk wake word/commands) when vosk and a model
+# are installed, otherwise the online speech_recognition + Google path.
+OFFLINE_VOICE = voice.offline_available()
+MIC_RETRY_S = 1.0           # back-off before reopening a failed microphone stream
 
 def beep():
     winsound.Beep(900, 150)
 
+def launch(cmd):
+    # don't wait for the program (os.system("notepad") blocked until it closed)
+    return lambda: subprocess.Popen(cmd, shell=True)
+
+def browse(url):
+    return lambda: webbrowser.open(url)
+
+def show_help():
+    add_msg("SYSTEM", "Available commands:")
+    add_msg("SYSTEM", "open github | youtube | gmail | linkedin | netflix | whatsapp")
+    add_msg("SYSTEM", "open settings | visual studio code | calculator | notepad")
+    add_msg("SYSTEM", "open file explorer | show desktop")
+    add_msg("SYSTEM", "click | double click | right click | scroll up | scroll down")
+    add_msg("SYSTEM", "pause gestures | resume gestures")
+    add_msg("SYSTEM", "search <topic> | pause listening | resume listening | exit")
+
+def set_state(name, value):
+    return lambda: send(STATE, (name, value))
+
+def mouse(action):
+    return lambda: send(MOUSE, action)
+
+def search(query):
+    if query:
+        add_msg("SYSTEM", f"Searching {query}")
+        webbrowser.open("https://www.google.com/search?q=" + quote_plus(query))
+    else:
+        add_msg("SYSTEM", "Search keyword missing")
+
+
+# ================= COMMANDS =================
+# All words must be spoken; the first matching row wins. A 4th column of
+# True passes the remaining words to the action (search <topic>).
+COMMANDS = [
+    # words              action                               reply
+    ("help",             show_help,                           None),
+    ("pause listening",  set_state("listening", False),       "Listening paused"),
+    ("resume listening", set_state("listening", True),        "Listening resumed"),
+    ("pause gestures",   set_state("gestures", False),        "Gestures paused"),
+    ("resume gestures",  set_state("gestures", True),         "Gestures resumed"),
+    ("open github",      browse("https://github.com"),        "Opening GitHub"),
+    ("open youtube",     browse("https://www.youtube.com"),   "Opening YouTube"),
+    ("open gmail",       browse("https://mail.google.com"),   "Opening Gmail"),
+    ("open linkedin",    browse("https://www.linkedin.com"),  "Opening LinkedIn"),
+    ("open netflix",     browse("https://www.netflix.com"),   "Opening Netflix"),
+    ("open whatsapp",    browse("https://web.whatsapp.com"),  "Opening WhatsApp Web"),
+    ("open settings",    launch("start ms-settings:"),        "Opening Settings"),
+    ("open visual",      launch("code"),                      "Opening Visual Studio Code"),
+    ("open code",        launch("code"),                      "Opening Visual Studio Code"),
+    ("open calculator",  launch("calc"),                      "Opening Calculator"),
+    ("open notepad",     launch("notepad"),                   "Opening Notepad"),
+    ("open file",        launch("explorer"),                  "Opening File Explorer"),
+    ("open files",       launch("explorer"),                  "Opening File Explorer"),
+    ("show desktop",     lambda: pyautogui.hotkey("win", "d"), "Showing Desktop"),
+    ("search",           search,                              None, True),
+    ("right click",      mouse("right click"),                None),
+    ("double click",     mouse("double click"),               None),
+    ("click",            mouse("click"),                      None),
+    ("scroll up",        mouse("scroll up"),                  None),
+    ("scroll down",      mouse("scroll down"),                None),
+    ("exit",             set_state("running", False),         "Exiting system"),
+]
+
+registry = CommandRegistry(on_reply=lambda text: add_msg("SYSTEM", text))
+for row in COMMANDS:
+    registry.add(*row)
+registry.compile()
+
+def handle_command(command):
+    # matches in microseconds and returns; the action runs on the command pool
+    if registry.dispatch(command) is None:
+        add_msg("SYSTEM", "Command not recognized")
+
+def offline_listener():
+    def on_status(text):
+        if text == "Wake word":
+            beep()
+        add_msg("SYSTEM", text)
+
+    def on_command(command):
+        add_msg("YOU", command)
+        handle_command(command)
+
+    listener = voice.VoiceListener(on_command, on_status, wake_word=wake_word)
+    add_msg("SYSTEM", "Listening (offline)...")
+    t = t_base = 0.0
+    while not stopped.is_set():
+        # a stream error (device unplugged, driver hiccup) reopens the
+        # microphone; the listener and its noise floor carry on
+        try:
+            for pcm, t_mic in voice.mic_frames(stop=stopped.is_set):
+                # audio time keeps counting across reopened streams
+                t = t_base + t_mic
+                # paused: the microphone keeps draining, nothing is recognized
+                if listening.is_set():
+                    listener.feed(pcm, t)
+        except Exception:
+            add_msg("SYSTEM", "Mic error - retrying")
+            stopped.wait(MIC_RETRY_S)
+        t_base = t
+    print(listener.summary())
+
 def voice_listener():
-    global running, gesture_enabled, listening_enabled
+    if OFFLINE_VOICE:
+        offline_listener()
+        return
 
-    while running:
-        if not listening_enabled:
-            time.sleep(0.5)
+    recognizer = sr.Recognizer()
+    microphone = sr.Microphone()
+
+    while not stopped.is_set():
+        if not listening.wait(0.5):
             continue
 
         try:
@@ -58,89 +187,7 @@ def voice_listener():
 
             # remove wake word
             command = command.replace(wake_word, "").strip()
-            time.sleep(0.3)
-
-            # ================= COMMAND EXECUTION =================
-
-            if "help" in command:
-                add_msg("SYSTEM", "Available commands:")
-                add_msg("SYSTEM", "open github | youtube | gmail | linkedin | netflix | whatsapp")
-                add_msg("SYSTEM", "open settings | visual studio code | calculator | notepad")
-                add_msg("SYSTEM", "open file explorer | show desktop")
-                add_msg("SYSTEM", "search <topic> | pause listening | resume listening | exit")
-
-            elif "pause" in command and "listening" in command:
-                listening_enabled = False
-                add_msg("SYSTEM", "Listening paused")
-
-            elif "resume" in command and "listening" in command:
-                listening_enabled = True
-                add_msg("SYSTEM", "Listening resumed")
-
-            elif "open" in command and "github" in command:
-                add_msg("SYSTEM", "Opening GitHub")
-                webbrowser.open("https://github.com")
-
-            elif "open" in command and "youtube" in command:
-                add_msg("SYSTEM", "Opening YouTube")
-                webbrowser.open("https://www.youtube.com")
-
-            elif "open" in command and "gmail" in command:
-                add_msg("SYSTEM", "Opening Gmail")
-                webbrowser.open("https://mail.google.com")
-
-            elif "open" in command and "linkedin" in command:
-                add_msg("SYSTEM", "Opening LinkedIn")
-                webbrowser.open("https://www.linkedin.com")
-
-            elif "open" in command and "netflix" in command:
-                add_msg("SYSTEM", "Opening Netflix")
-                webbrowser.open("https://www.netflix.com")
-
-            elif "open" in command and "whatsapp" in command:
-                add_msg("SYSTEM", "Opening WhatsApp Web")
-                webbrowser.open("https://web.whatsapp.com")
-
-            elif "open" in command and "settings" in command:
-                add_msg("SYSTEM", "Opening Settings")
-                os.system("start ms-settings:")
-
-            elif ("open" in command and "visual" in command) or ("open" in command and "code" in command):
-                add_msg("SYSTEM", "Opening Visual Studio Code")
-                os.system("code")
-
-            elif "open" in command and "calculator" in command:
-                add_msg("SYSTEM", "Opening Calculator")
-                os.system("calc")
-
-            elif "open" in command and "notepad" in command:
-                add_msg("SYSTEM", "Opening Notepad")
-                os.system("notepad")
-
-            elif "open" in command and "file" in command:
-                add_msg("SYSTEM", "Opening File Explorer")
-                os.system("explorer")
-
-            elif "show" in command and "desktop" in command:
-                add_msg("SYSTEM", "Showing Desktop")
-                pyautogui.hotkey("win", "d")
-
-            elif "search" in command:
-                query = command.replace("search", "").strip()
-                if query:
-                    add_msg("SYSTEM", f"Searching {query}")
-                    webbrowser.open(f"https://www.google.com/search?q={query}")
-                else:
-                    add_msg("SYSTEM", "Search keyword missing")
-
-            elif "exit" in command:
-                add_msg("SYSTEM", "Exiting system")
-                running = False
-
-            else:
-                add_msg("SYSTEM", "Command not recognized")
-
-            time.sleep(0.6)
+            handle_command(command)
 
         except sr.WaitTimeoutError:
             add_msg("SYSTEM", "No speech detected")
@@ -165,62 +212,144 @@ cursor_x, cursor_y = screen_w // 2, screen_h // 2
 MOVE_ALPHA = 0.05
 DEADZONE = 40
 dragging = False
-
-def finger_open(lm, tip, pip):
-    return lm[tip].y < lm[pip].y
-
-# ================= MAIN LOOP =================
-while running:
-    ret, frame = cap.read()
-    if not ret:
-        break
-
-    frame = cv2.flip(frame, 1)
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    result = hands.process(rgb)
-
-    if gesture_enabled and result.multi_hand_landmarks:
-        lm = result.multi_hand_landmarks[0].landmark
-        mp_draw.draw_landmarks(frame, result.multi_hand_landmarks[0], mp_hands.HAND_CONNECTIONS)
-
-        index_open = finger_open(lm, 8, 6)
-        middle_open = finger_open(lm, 12, 10)
-        ring_open = finger_open(lm, 16, 14)
-        pinky_open = finger_open(lm, 20, 18)
-
-        # Cursor move
-        if index_open and middle_open:
-            ix = lm[8].x * screen_w
-            iy = lm[8].y * screen_h
-            dx, dy = ix - cursor_x, iy - cursor_y
-            if abs(dx) > DEADZONE or abs(dy) > DEADZONE:
-                cursor_x += dx * MOVE_ALPHA
-                cursor_y += dy * MOVE_ALPHA
-                pyautogui.moveTo(cursor_x, cursor_y)
-
-        # Drag & drop
-        if not index_open and not middle_open and not ring_open and not pinky_open:
-            if not dragging:
-                pyautogui.mouseDown()
-                dragging = True
-        else:
-            if dragging:
-                pyautogui.mouseUp()
-                dragging = False
-
-    # ================= CHAT UI =================
-    cv2.rectangle(frame, (0, 0), (900, 300), (0, 0, 0), -1)
+gesture_enabled = True
+running = True
+chat = deque(maxlen=10)
+hf = HandFrame()
+
+MOUSE_ACTIONS = {
+    "click":        lambda: pointer.click(),
+    "double click": lambda: (pointer.click(), pointer.click()),
+    "right click":  lambda: pointer.rightClick(),
+    "scroll up":    lambda: pointer.scroll(SCROLL_NOTCHES),
+    "scroll down":  lambda: pointer.scroll(-SCROLL_NOTCHES),
+}
+
+def handle_events():
+    # non-blocking: whatever the other threads published since the last frame
+    global gesture_enabled, running, dragging
+    for kind, payload in bus.drain():
+        if kind == UI:
+            chat.append(f"{payload[0]}: {payload[1]}")
+        elif kind == MOUSE:
+            MOUSE_ACTIONS[payload]()
+        elif kind == GESTURE:
+            chat.append(f"GESTURE: {payload}")
+        elif kind == STATE:
+            name, value = payload
+            if name == "gestures":
+                gesture_enabled = value
+                if not value and dragging:
+                    pointer.mouseUp()
+                    dragging = False
+            elif name == "listening":
+                (listening.set if value else listening.clear)()
+            elif name == "running":
+                running = value
+
+# No hand for a while -> low-rate presence probe (see scheduler.py)
+sched = AdaptiveScheduler()
+slot = FrameSlot()      # reused camera/RGB/preview buffers
+mem = MemStats()
+tel = telemetry_from_argv()     # --metrics=FILE / --metrics-port=PORT
+
+# Chat box is pre-rendered and redrawn only when a line arrives; the window
+# is drawn by a throttled render thread (--headless: no window at all)
+preview = preview_from_argv("Gesture + Voice Assistant (Alpha)", tel)
+chat_box = OverlayLayer(900, 300, opaque=True)
+
+def draw_chat(layer):
     y = 25
     for msg in chat:
         color = (0, 255, 0) if msg.startswith("SYSTEM") else (255, 255, 255)
-        cv2.putText(frame, msg, (10, y),
+        cv2.putText(layer, msg, (10, y),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.5, color, 1)
         y += 28
 
-    cv2.imshow("Gesture + Voice Assistant (Alpha)", frame)
-    if cv2.waitKey(1) & 0xFF == 27:
-        break
+# ================= MAIN LOOP =================
+# headless: say 'alpha exit' or press Ctrl+C
+try:
+    while running:
+        handle_events()
+        if not running:
+            break
+        if not sched.due(time.perf_counter()):
+            # idle: keep the camera buffer fresh without decoding or drawing
+            if not cap.grab():
+                break
+            continue
 
-running = False
+        t = t_frame = tel.now()
+        if not slot.read(cap):
+            break
+        t = tel.record("cap.read", t)
+
+        # landmarks are mirrored instead of flipping the camera image
+        result = mirror_hands(hands.process(sched.prepare(slot.to_rgb())))
+        t = tel.record("hands.process", t)
+        sched.observe(gesture_enabled and bool(result.multi_hand_landmarks), time.perf_counter())
+
+        if gesture_enabled and result.multi_hand_landmarks:
+            hf.load(result.multi_hand_landmarks[0])
+
+            # Cursor move
+            if hf.index_up and hf.middle_up:
+                ix, iy = hf.point(INDEX_TIP)
+                ix *= screen_w
+                iy *= screen_h
+                dx, dy = ix - cursor_x, iy - cursor_y
+                if abs(dx) > DEADZONE or abs(dy) > DEADZONE:
+                    cursor_x += dx * MOVE_ALPHA
+                    cursor_y += dy * MOVE_ALPHA
+                    pointer.moveTo(cursor_x, cursor_y)
+
+            # Drag & drop
+            if hf.none_up:
+                if not dragging:
+                    pointer.mouseDown()
+                    dragging = True
+                    bus.publish(GESTURE, "drag")
+                    tel.count("gestures", label="DRAG")
+            else:
+                if dragging:
+                    pointer.mouseUp()
+                    dragging = False
+                    bus.publish(GESTURE, "drop")
+                    tel.count("gestures", label="DROP")
+        t = tel.record("decision", t)
+
+        pointer.flush()
+        t = tel.record("pointer", t)
+        tel.observe("capture->output", t - t_frame)
+
+        # ================= CHAT UI =================
+        if preview.enabled:
+            frame = slot.preview()
+            if gesture_enabled and result.multi_hand_landmarks:
+                mp_draw.draw_landmarks(frame, result.multi_hand_landmarks[0], mp_hands.HAND_CONNECTIONS)
+            chat_box.update(tuple(chat), draw_chat)
+            chat_box.blit(frame)
+            t = tel.record("overlay", t)
+            preview.show(frame)
+            tel.record("preview.show", t)
+
+        tel.count("frames")
+        mem.tick()
+        if preview.poll_key() == 27:
+            break
+except KeyboardInterrupt:
+    pass
+
+stopped.set()
 cap.release()
-cv2.destroyAllWindows()
+preview.close()
+pointer.close()
+print(sched.summary())
+print(pointer.summary())
+print(mem.summary())
+print(preview.summary())
+print(registry.summary())
+print(bus.summary())
+print(tel.summary())
+tel.close()
+registry.close()
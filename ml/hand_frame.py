@@ -0,0 +1,104 @@
+# hand_frame.py
+# One preallocated (21,3) float32 landmark array per frame, plus every
+# finger-state / distance predicate the mouse scripts need, computed in a
+# single vectorized pass. All scripts go through this instead of reading
+# MediaPipe protobuf landmarks one attribute at a time.
+
+from array import array
+
+import numpy as np
+
+# MediaPipe hand landmark ids
+WRIST = 0
+THUMB_TIP = 4
+INDEX_PIP, INDEX_TIP = 6, 8
+PALM = 9
+MIDDLE_PIP, MIDDLE_TIP = 10, 12
+RING_PIP, RING_TIP = 14, 16
+PINKY_PIP, PINKY_TIP = 18, 20
+
+# index, middle, ring, pinky
+TIPS = np.array([INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP], np.intp)
+PIPS = np.array([INDEX_PIP, MIDDLE_PIP, RING_PIP, PINKY_PIP], np.intp)
+
+# distance pairs: four fingertips to palm, then index tip to middle tip
+_DIST_A = np.array([INDEX_TIP, MIDDLE_TIP, RING_TIP, PINKY_TIP, INDEX_TIP], np.intp)
+_DIST_B = np.array([PALM, PALM, PALM, PALM, MIDDLE_TIP], np.intp)
+
+
+class HandFrame:
+    """Landmarks of one hand for the current frame (normalized image coords)."""
+
+    def __init__(self):
+        # load() writes the landmarks straight into this flat buffer (array
+        # item stores are cheaper than NumPy scalar stores); pts views it
+        self._raw = array("f", bytes(21 * 3 * 4))
+        self.pts = np.frombuffer(self._raw, np.float32).reshape(21, 3)
+        self.xy = np.zeros(42, np.float32)   # x0,y0,x1,y1,... model features
+        self._xy2 = self.xy.reshape(21, 2)
+        self.up = np.zeros(4, bool)      # tip above pip
+        self.fold = np.zeros(4, bool)    # tip below pip
+        self.dist = np.zeros(5, np.float64)
+        # scratch buffers so update() does not allocate arrays
+        self._ty = np.zeros(4, np.float32)
+        self._py = np.zeros(4, np.float32)
+        self._a = np.zeros((5, 3), np.float32)
+        self._b = np.zeros((5, 3), np.float32)
+        self._d = np.zeros((5, 2), np.float64)
+        self._dx = self._d[:, 0]
+        self._dy = self._d[:, 1]
+
+    def load(self, hand_landmarks):
+        # hand_landmarks: one entry of result.multi_hand_landmarks
+        raw = self._raw
+        i = 0
+        for l in hand_landmarks.landmark:
+            raw[i] = l.x
+            raw[i + 1] = l.y
+            raw[i + 2] = l.z
+            i += 3
+        self.update()
+        return self
+
+    def load_xy(self, row):
+        # row: 42 values x0,y0,x1,y1,... as written by collect_data.py
+        self.pts[:, :2] = np.asarray(row, np.float32).reshape(21, 2)
+        self.pts[:, 2] = 0.0
+        self.update()
+        return self
+
+    def update(self):
+        pts = self.pts
+        self._xy2[:] = pts[:, :2]
+        y = pts[:, 1]
+        np.take(y, TIPS, out=self._ty)
+        np.take(y, PIPS, out=self._py)
+        np.less(self._ty, self._py, out=self.up)
+        np.greater(self._ty, self._py, out=self.fold)
+
+        np.take(pts, _DIST_A, axis=0, out=self._a)
+        np.take(pts, _DIST_B, axis=0, out=self._b)
+        np.subtract(self._a[:, :2], self._b[:, :2], out=self._d)
+        np.hypot(self._dx, self._dy, out=self.dist)
+
+        self.index_up, self.middle_up, self.ring_up, self.pinky_up = self.up.tolist()
+        self.index_fold, self.middle_fold, self.ring_fold, self.pinky_fold = self.fold.tolist()
+        self.all_up = self.index_up and self.middle_up and self.ring_up and self.pinky_up
+        self.all_fold = self.index_fold and self.middle_fold and self.ring_fold and self.pinky_fold
+        self.none_up = not (self.index_up or self.middle_up or self.ring_up or self.pinky_up)
+        d = self.dist.tolist()
+        self.avg_tip_palm = (d[0] + d[1] + d[2] + d[3]) / 4.0
+        self.index_middle_dist = d[4]
+        ty = self._ty.tolist()
+        self.tip_y_mean = (ty[0] + ty[1] + ty[2] + ty[3]) / 4.0
+
+    def point(self, i):
+        return float(self.pts[i, 0]), float(self.pts[i, 1])
+
+    def is_fist(self, max_tip_palm):
+        # index/middle not up, ring/pinky folded, fingertips pulled to the palm
+        return (not self.index_up and not self.middle_up and self.ring_fold
+                and self.pinky_fold and self.avg_tip_palm < max_tip_palm)
+
+    def xy_row(self):
+        return self.xy.tolist()
@@ -0,0 +1,226 @@
+# output_thread.py
+# High-rate pointer output decoupled from the camera frame rate.
+#
+# The vision loop keeps calling moveTo() once per camera frame (~30 Hz);
+# InterpolatingPointer only records those as targets. Its own thread ticks at
+# OUTPUT_HZ and glides the real cursor from where it is to the newest target
+# over one measured target interval, so the cursor moves in small steps at
+# display rate instead of jumping every camera frame.
+#
+#   mode="interp"  glide to the latest target (no overshoot)
+#   mode="extrap"  glide to the latest target plus one interval of its
+#                  velocity, hiding roughly a frame of camera latency
+#
+# Scroll deltas are spread over SCROLL_SPREAD_S instead of arriving as one
+# burst per frame. Each button records the target that was current when it
+# was issued and snaps the cursor there first, so clicks and drags land
+# exactly where the engine asked even if newer moves are already queued.
+# All backend calls happen on the output thread, in the order they were issued.
+#
+# macOS requires input injection from the main thread, so OUTPUT_HZ is 0
+# there (plain per-frame CoalescingPointer).
+
+import sys
+import time
+import threading
+from collections import deque
+
+from pointer import CallStats
+
+OUTPUT_HZ = 0 if sys.platform == "darwin" else 120
+SCROLL_SPREAD_S = 0.12
+MIN_SPAN_S, MAX_SPAN_S = 0.005, 0.1     # clamp on the measured target interval
+
+
+class InterpolatingPointer(threading.Thread):
+    def __init__(self, backend, rate_hz=OUTPUT_HZ, mode="interp", scroll_spread=SCROLL_SPREAD_S):
+        super().__init__(name="pointer-output", daemon=True)
+        self.backend = backend
+        self.period = 1.0 / rate_hz
+        self.mode = mode
+        self.scroll_spread = scroll_spread
+        self._lock = threading.Lock()
+        self._cmds = deque()
+        self._quit = threading.Event()
+
+        # latest targets (written by the vision loop under _lock)
+        self._target = None
+        self._t_target = 0.0
+        self._vel = (0.0, 0.0)
+        self._span = 1.0 / 30.0
+        self._new_target = False
+
+        # output-thread state
+        self._pos = None            # float cursor position we last computed
+        self._last = None           # int position last sent
+        self._seg = None            # (x0, y0, x1, y1, t0, span)
+        self._scroll_left = 0.0
+        self._scroll_rate = 0.0
+        self._scroll_acc = 0.0
+
+        # metrics
+        self.stats = {}
+        self.targets = 0
+        self.moves = 0
+        self.ticks = 0
+        self._intervals = deque(maxlen=1000)
+
+    # ---------------- vision-loop side ----------------
+    def size(self):
+        return self.backend.size()
+
+    def moveTo(self, x, y):
+        now = time.perf_counter()
+        with self._lock:
+            if self._target is not None:
+                dt = now - self._t_target
+                if dt < MAX_SPAN_S:
+                    self._span += 0.2 * (max(dt, MIN_SPAN_S) - self._span)
+                    self._vel = ((x - self._target[0]) / max(dt, MIN_SPAN_S),
+                                 (y - self._target[1]) / max(dt, MIN_SPAN_S))
+                else:
+                    self._vel = (0.0, 0.0)
+            self._target = (float(x), float(y))
+            self._t_target = now
+            self._new_target = True
+            self.targets += 1
+
+    def flush(self):
+        # moves are emitted by the output thread
+        pass
+
+    # buttons carry the target in effect when they were issued
+    def click(self):
+        self._cmds.append(("click", self._target))
+
+    def rightClick(self):
+        self._cmds.append(("rightClick", self._target))
+
+    def mouseDown(self):
+        self._cmds.append(("mouseDown", self._target))
+
+    def mouseUp(self):
+        self._cmds.append(("mouseUp", self._target))
+
+    def scroll(self, n):
+        self._cmds.append(("scroll", n))
+
+    def close(self):
+        self._quit.set()
+        if self.is_alive():
+            self.join(timeout=1.0)
+
+    # ---------------- output thread ----------------
+    def _call(self, name, *args):
+        t0 = time.perf_counter()
+        getattr(self.backend, name)(*args)
+        dt = time.perf_counter() - t0
+        st = self.stats.get(name)
+        if st is None:
+            st = self.stats[name] = CallStats()
+        st.add(dt)
+
+    def _send(self, x, y):
+        p = (int(x), int(y))
+        if p != self._last:
+            self._call("moveTo", *p)
+            self._last = p
+            self.moves += 1
+
+    def _snap(self, target):
+        # jump to the button's own target so it lands exactly there; a newer
+        # target is glided to from this point afterwards
+        if target is None:
+            return
+        with self._lock:
+            if self._target == target:
+                self._new_target = False
+        self._seg = None
+        self._pos = target
+        self._send(*target)
+
+    def _drain_scroll(self):
+        # emit whatever is still queued before a button press
+        if self._scroll_left:
+            self._call("scroll", int(self._scroll_left))
+        self._scroll_left = self._scroll_acc = self._scroll_rate = 0.0
+
+    def _run_commands(self):
+        while self._cmds:
+            cmd = self._cmds.popleft()
+            if cmd[0] == "scroll":
+                self._scroll_left += int(cmd[1])
+                self._scroll_rate = self._scroll_left / self.scroll_spread
+            else:
+                self._drain_scroll()
+                self._snap(cmd[1])
+                self._call(cmd[0])
+
+    def _step_cursor(self, now):
+        with self._lock:
+            if self._new_target:
+                self._new_target = False
+                tx, ty = self._target
+                span = min(max(self._span, MIN_SPAN_S), MAX_SPAN_S)
+                if self.mode == "extrap":
+                    tx += self._vel[0] * span
+                    ty += self._vel[1] * span
+                x0, y0 = self._pos if self._pos is not None else (tx, ty)
+                self._seg = (x0, y0, tx, ty, now, span)
+        if self._seg is None:
+            return
+        x0, y0, x1, y1, t0, span = self._seg
+        a = min(1.0, (now - t0) / span)
+        self._pos = (x0 + (x1 - x0) * a, y0 + (y1 - y0) * a)
+        self._send(*self._pos)
+        if a >= 1.0:
+            self._seg = None
+
+    def _step_scroll(self, dt):
+        # _scroll_left: whole notches not yet sent, _scroll_acc: fractional progress
+        if not self._scroll_left:
+            return
+        self._scroll_acc += self._scroll_rate * dt
+        if abs(self._scroll_acc) > abs(self._scroll_left):
+            self._scroll_acc = self._scroll_left
+        n = int(self._scroll_acc)
+        if n:
+            self._call("scroll", n)
+            self._scroll_acc -= n
+            self._scroll_left -= n
+        if not self._scroll_left:
+            self._scroll_acc = self._scroll_rate = 0.0
+
+    def run(self):
+        last = next_tick = time.perf_counter()
+        while not self._quit.is_set():
+            now = time.perf_counter()
+            if self.ticks:
+                self._intervals.append(now - last)
+            self.ticks += 1
+            self._run_commands()
+            self._step_cursor(now)
+            self._step_scroll(now - last)
+            last = now
+            next_tick += self.period
+            delay = next_tick - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_tick = time.perf_counter()     # fell behind: don't burst
+        self._run_commands()
+        self._drain_scroll()
+
+    def summary(self):
+        iv = sorted(self._intervals)
+        lines = [f"output   {self.ticks} ticks  targets {self.targets}  moves {self.moves}"]
+        if len(iv) > 1:
+            mean = sum(iv) / len(iv)
+            sd = (sum((v - mean) ** 2 for v in iv) / len(iv)) ** 0.5
+            p99 = iv[min(len(iv) - 1, int(len(iv) * 0.99))]
+            lines.append(f"  rate {1.0 / mean:6.1f} Hz (target {1.0 / self.period:.0f})  "
+                         f"tick interval sd {1000 * sd:.2f} ms  p99 {1000 * p99:.2f} ms")
+        for name, st in sorted(self.stats.items()):
+            lines.append(f"  {name:<10} {st.count:6d} calls  avg {1e6 * st.total / st.count:8.1f} us"
+                         f"  max {1e6 * st.max:8.1f} us")
+        return "\n".join(lines)
@@ -0,0 +1,246 @@
+# pipeline.py
+# Staged capture -> inference -> actuation pipeline for the camera scripts.
+# Capture runs on its own thread and only ever keeps the newest frame, so a
+# slow stage never lets stale frames pile up in the camera buffer.
+# Frames live in preallocated FramePool slots (see frame_buffers.py) that go
+# back to the pool when a packet is displayed or dropped.
+# Stage spans (cap.read, hands.process) and dropped frames go to a
+# telemetry.Telemetry when one is passed in.
+
+import threading
+import queue
+import time
+from collections import deque
+
+from frame_buffers import FramePool, MemStats, mirror_hands
+from telemetry import Telemetry
+
+
+class Packet:
+    __slots__ = ("seq", "t_capture", "t_infer", "slot", "frame", "result")
+
+    def __init__(self, seq, t_capture, slot):
+        self.seq = seq
+        self.t_capture = t_capture
+        self.t_infer = 0.0
+        self.slot = slot
+        self.frame = None       # mirrored preview, filled in by inference
+        self.result = None
+
+
+class LatestQueue:
+    """Bounded queue that drops the oldest item instead of blocking the producer."""
+
+    def __init__(self, maxsize=1, on_drop=None):
+        self._q = queue.Queue(maxsize=maxsize)
+        self.on_drop = on_drop
+        self.dropped = 0
+
+    def put(self, item):
+        while True:
+            try:
+                self._q.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    old = self._q.get_nowait()
+                    self.dropped += 1
+                    if self.on_drop is not None and old is not None:
+                        self.on_drop(old)
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        return self._q.get(timeout=timeout)
+
+    def qsize(self):
+        return self._q.qsize()
+
+
+class StageStats:
+    """Per-stage throughput plus capture-relative latency samples (seconds)."""
+
+    def __init__(self, name, window=300):
+        self.name = name
+        self.count = 0
+        self.busy = 0.0
+        self.lat = deque(maxlen=window)
+        self._t_start = time.perf_counter()
+
+    def tick(self, busy_s, t_capture=None):
+        self.count += 1
+        self.busy += busy_s
+        if t_capture is not None:
+            self.lat.append(time.perf_counter() - t_capture)
+
+    def fps(self):
+        el = time.perf_counter() - self._t_start
+        return self.count / el if el > 0 else 0.0
+
+    def latency(self, q=0.5):
+        # capture-relative latency quantile in seconds (0.0 before any sample)
+        if not self.lat:
+            return 0.0
+        lat = sorted(self.lat)
+        return lat[min(len(lat) - 1, int(len(lat) * q))]
+
+    def summary(self):
+        s = f"{self.name:<9} {self.fps():6.1f}/s"
+        if self.count:
+            s += f"  busy {1000.0 * self.busy / self.count:6.2f} ms"
+        if self.lat:
+            s += (f"  lat p50 {1000.0 * self.latency(0.5):6.1f} ms  "
+                  f"p95 {1000.0 * self.latency(0.95):6.1f} ms")
+        return s
+
+
+class CaptureThread(threading.Thread):
+    def __init__(self, cap, out_q, stop, sched=None, pool=None, tel=None):
+        super().__init__(name="capture", daemon=True)
+        self.cap = cap
+        self.tel = tel or Telemetry(enabled=False)
+        self.pool = pool or FramePool()
+        self.out_q = out_q
+        self.stop = stop
+        self.sched = sched
+        self.stats = StageStats("capture")
+
+    def run(self):
+        seq = 0
+        while not self.stop.is_set():
+            t0 = time.perf_counter()
+            if self.sched is not None and not self.sched.due(t0):
+                # idle: dequeue the frame without decoding it
+                if not self.cap.grab():
+                    print("Camera frame not received.")
+                    break
+                continue
+            slot = self.pool.acquire()
+            t_read = time.perf_counter()
+            ok = slot.read(self.cap)
+            self.tel.record("cap.read", t_read)
+            if not ok:
+                self.pool.release(slot)
+                print("Camera frame not received.")
+                break
+            self.out_q.put(Packet(seq, time.perf_counter(), slot))
+            self.stats.tick(time.perf_counter() - t0)
+            seq += 1
+        self.out_q.put(None)
+
+
+class InferenceThread(threading.Thread):
+    # Owns the MediaPipe graph; `hands` must only be used from this thread.
+    def __init__(self, hands, in_q, out_q, stop, sched=None, preview=True, tel=None):
+        super().__init__(name="inference", daemon=True)
+        self.hands = hands
+        self.preview = preview
+        self.tel = tel or Telemetry(enabled=False)
+        self.in_q = in_q
+        self.out_q = out_q
+        self.stop = stop
+        self.sched = sched
+        self.stats = StageStats("inference")
+
+    def run(self):
+        while not self.stop.is_set():
+            try:
+                pkt = self.in_q.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            if pkt is None:
+                break
+            t0 = time.perf_counter()
+            # detect on the unflipped frame and mirror the landmarks instead
+            img = pkt.slot.to_rgb()
+            if self.sched is not None:
+                img = self.sched.prepare(img)
+            t_proc = time.perf_counter()
+            pkt.result = mirror_hands(self.hands.process(img))
+            self.tel.record("hands.process", t_proc)
+            if self.preview:
+                pkt.frame = pkt.slot.preview()
+            pkt.t_infer = time.perf_counter()
+            if self.sched is not None:
+                self.sched.observe(bool(pkt.result.multi_hand_landmarks), pkt.t_infer)
+            self.out_q.put(pkt)
+            self.stats.tick(pkt.t_infer - t0, pkt.t_capture)
+        self.out_q.put(None)
+
+
+class Pipeline:
+    """Wires capture and inference threads; the caller runs actuation/render.
+
+    Actuation stays on the calling (main) thread because cv2.imshow and the
+    pyautogui backends are not safe to drive from worker threads everywhere.
+    """
+
+    def __init__(self, cap, hands, report_every=5.0, sched=None, preview=True, tel=None):
+        self.stop = threading.Event()
+        self.sched = sched
+        self.tel = tel or Telemetry(enabled=False)
+        self.pool = FramePool()
+        self.mem = MemStats()
+        # each queue drops on its producer's thread, so each gets its own counter
+        self.frame_q = LatestQueue(1, on_drop=lambda pkt: self._dropped(pkt, "capture"))
+        self.result_q = LatestQueue(1, on_drop=lambda pkt: self._dropped(pkt, "inference"))
+        self.capture = CaptureThread(cap, self.frame_q, self.stop, sched, self.pool, self.tel)
+        # preview=False (headless): no mirrored display copy is made
+        self.inference = InferenceThread(hands, self.frame_q, self.result_q, self.stop, sched,
+                                         preview, self.tel)
+        self.actuation = StageStats("actuation")
+        self.move_lat = StageStats("cap->move")
+        self.report_every = report_every
+        self._last_report = time.perf_counter()
+
+    def start(self):
+        self.capture.start()
+        self.inference.start()
+        return self
+
+    def get(self, timeout=1.0):
+        # Returns the newest inferred packet, or None once the camera stops.
+        while True:
+            try:
+                return self.result_q.get(timeout=timeout)
+            except queue.Empty:
+                if not self.inference.is_alive():
+                    return None
+
+    def _release(self, pkt):
+        self.pool.release(pkt.slot)
+        pkt.slot = pkt.frame = None
+
+    def _dropped(self, pkt, stage):
+        self.tel.count("frames_dropped", label=stage)
+        self._release(pkt)
+
+    def done(self, pkt, busy_s):
+        # the packet's buffers are reused after this call
+        self._release(pkt)
+        self.tel.count("frames")
+        self.mem.tick()
+        self.actuation.tick(busy_s, pkt.t_capture)
+        if self.report_every and time.perf_counter() - self._last_report > self.report_every:
+            self.report()
+            self._last_report = time.perf_counter()
+
+    def moved(self, pkt):
+        # Call right after the cursor was moved for this packet.
+        self.move_lat.tick(0.0, pkt.t_capture)
+
+    def report(self):
+        print("---- pipeline ----")
+        for st in (self.capture.stats, self.inference.stats, self.actuation, self.move_lat):
+            print(st.summary())
+        print(f"dropped  capture->inference {self.frame_q.dropped}  "
+              f"inference->actuation {self.result_q.dropped}")
+        print(f"frames   pool {self.pool.size} slots (grown {self.pool.grown})")
+        print(self.mem.summary())
+        if self.sched is not None:
+            print(self.sched.summary())
+
+    def close(self):
+        self.stop.set()
+        self.capture.join(timeout=1.0)
+        self.inference.join(timeout=1.0)
@@ -0,0 +1,303 @@
+# pointer.py
+# Pointer output layer used by the mouse scripts instead of calling pyautogui
+# directly. Every backend exposes the pyautogui call names the gesture
+# engines use (moveTo, click, rightClick, scroll, mouseDown, mouseUp, size)
+# plus flush().
+#
+#   pyautogui  pyautogui with the hidden per-call PAUSE sleep disabled (default)
+#   xtest      X11 XTEST fake input via python-xlib (Linux/X11)
+#   uinput     kernel virtual absolute pointer via python-evdev (Linux, needs /dev/uinput)
+#   fake       in-memory event recorder for tests and replay
+#
+# CoalescingPointer wraps any backend: moves are held until flush() (once per
+# frame) or the next button/scroll call, only the last one is sent, and it is
+# skipped when the integer position has not changed.
+# output_thread.InterpolatingPointer instead emits moves from its own thread
+# at display rate (--output-hz=N, 0 = per-frame coalescing).
+#
+# Pick a backend with --pointer=NAME on the command line.
+
+import sys
+import time
+
+
+class PyAutoGuiPointer:
+    def __init__(self, pause=0.0):
+        import pyautogui
+        pyautogui.FAILSAFE = False
+        # pyautogui sleeps PAUSE (0.1 s default) after every call
+        pyautogui.PAUSE = pause
+        self._pg = pyautogui
+
+    def size(self):
+        return self._pg.size()
+
+    def moveTo(self, x, y):
+        self._pg.moveTo(int(x), int(y), _pause=False)
+
+    def click(self):
+        self._pg.click(_pause=False)
+
+    def rightClick(self):
+        self._pg.rightClick(_pause=False)
+
+    def scroll(self, n):
+        self._pg.scroll(int(n), _pause=False)
+
+    def mouseDown(self):
+        self._pg.mouseDown(_pause=False)
+
+    def mouseUp(self):
+        self._pg.mouseUp(_pause=False)
+
+    def flush(self):
+        pass
+
+
+class XTestPointer:
+    # X11 buttons: 1 left, 3 right, 4/5 wheel up/down
+    def __init__(self, display_name=None):
+        from Xlib import X, display
+        from Xlib.ext import xtest
+        self._X = X
+        self._xtest = xtest
+        self._d = display.Display(display_name)
+        screen = self._d.screen()
+        self._size = (screen.width_in_pixels, screen.height_in_pixels)
+
+    def size(self):
+        return self._size
+
+    def _button(self, button, press):
+        ev = self._X.ButtonPress if press else self._X.ButtonRelease
+        self._xtest.fake_input(self._d, ev, button)
+
+    def moveTo(self, x, y):
+        self._xtest.fake_input(self._d, self._X.MotionNotify, x=int(x), y=int(y))
+        self._d.flush()
+
+    def click(self):
+        self._button(1, True); self._button(1, False)
+        self._d.flush()
+
+    def rightClick(self):
+        self._button(3, True); self._button(3, False)
+        self._d.flush()
+
+    def scroll(self, n):
+        button = 4 if n > 0 else 5
+        for _ in range(abs(int(n))):
+            self._button(button, True); self._button(button, False)
+        self._d.flush()
+
+    def mouseDown(self):
+        self._button(1, True)
+        self._d.flush()
+
+    def mouseUp(self):
+        self._button(1, False)
+        self._d.flush()
+
+    def flush(self):
+        pass
+
+
+class UInputPointer:
+    def __init__(self, screen_w=None, screen_h=None):
+        from evdev import UInput, AbsInfo, ecodes as e
+        if screen_w is None or screen_h is None:
+            import pyautogui
+            screen_w, screen_h = pyautogui.size()
+        self._e = e
+        self._size = (screen_w, screen_h)
+        caps = {
+            e.EV_KEY: [e.BTN_LEFT, e.BTN_RIGHT],
+            e.EV_ABS: [(e.ABS_X, AbsInfo(0, 0, screen_w - 1, 0, 0, 0)),
+                       (e.ABS_Y, AbsInfo(0, 0, screen_h - 1, 0, 0, 0))],
+            e.EV_REL: [e.REL_WHEEL],
+        }
+        self._ui = UInput(caps, name="gesture-virtual-mouse")
+
+    def size(self):
+        return self._size
+
+    def _key(self, code, value):
+        self._ui.write(self._e.EV_KEY, code, value)
+        self._ui.syn()
+
+    def moveTo(self, x, y):
+        self._ui.write(self._e.EV_ABS, self._e.ABS_X, int(x))
+        self._ui.write(self._e.EV_ABS, self._e.ABS_Y, int(y))
+        self._ui.syn()
+
+    def click(self):
+        self._key(self._e.BTN_LEFT, 1); self._key(self._e.BTN_LEFT, 0)
+
+    def rightClick(self):
+        self._key(self._e.BTN_RIGHT, 1); self._key(self._e.BTN_RIGHT, 0)
+
+    def scroll(self, n):
+        self._ui.write(self._e.EV_REL, self._e.REL_WHEEL, int(n))
+        self._ui.syn()
+
+    def mouseDown(self):
+        self._key(self._e.BTN_LEFT, 1)
+
+    def mouseUp(self):
+        self._key(self._e.BTN_LEFT, 0)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self._ui.close()
+
+
+class FakePointer:
+    """Records every call as [frame, t, name, *args]; set .frame/.t before each frame."""
+
+    def __init__(self, w=1920, h=1080):
+        self.w, self.h = w, h
+        self.events = []
+        self.frame = 0
+        self.t = 0.0
+
+    def size(self):
+        return self.w, self.h
+
+    def _rec(self, name, *args):
+        self.events.append([self.frame, round(self.t, 6), name, *args])
+
+    def moveTo(self, x, y):
+        self._rec("moveTo", int(x), int(y))
+
+    def click(self):
+        self._rec("click")
+
+    def rightClick(self):
+        self._rec("rightClick")
+
+    def scroll(self, n):
+        self._rec("scroll", int(n))
+
+    def mouseDown(self):
+        self._rec("mouseDown")
+
+    def mouseUp(self):
+        self._rec("mouseUp")
+
+    def flush(self):
+        pass
+
+
+class CallStats:
+    __slots__ = ("count", "total", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, dt):
+        self.count += 1
+        self.total += dt
+        if dt > self.max:
+            self.max = dt
+
+
+class CoalescingPointer:
+    """Per-frame move coalescing plus per-call latency stats around any backend."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.stats = {}
+        self.merged = 0      # moves replaced by a later move in the same frame
+        self.skipped = 0     # moves to the position we are already at
+        self._pending = None
+        self._last = None
+
+    def _call(self, name, *args):
+        t0 = time.perf_counter()
+        getattr(self.backend, name)(*args)
+        dt = time.perf_counter() - t0
+        st = self.stats.get(name)
+        if st is None:
+            st = self.stats[name] = CallStats()
+        st.add(dt)
+
+    def size(self):
+        return self.backend.size()
+
+    def moveTo(self, x, y):
+        if self._pending is not None:
+            self.merged += 1
+        self._pending = (int(x), int(y))
+
+    def flush(self):
+        p = self._pending
+        if p is None:
+            return
+        self._pending = None
+        if p == self._last:
+            self.skipped += 1
+            return
+        self._call("moveTo", *p)
+        self._last = p
+
+    def click(self):
+        self.flush(); self._call("click")
+
+    def rightClick(self):
+        self.flush(); self._call("rightClick")
+
+    def scroll(self, n):
+        self.flush(); self._call("scroll", int(n))
+
+    def mouseDown(self):
+        self.flush(); self._call("mouseDown")
+
+    def mouseUp(self):
+        self.flush(); self._call("mouseUp")
+
+    def close(self):
+        self.flush()
+
+    def summary(self):
+        lines = [f"pointer  merged {self.merged}  skipped {self.skipped}"]
+        for name, st in sorted(self.stats.items()):
+            lines.append(f"  {name:<10} {st.count:6d} calls  avg {1e6 * st.total / st.count:8.1f} us"
+                         f"  max {1e6 * st.max:8.1f} us")
+        return "\n".join(lines)
+
+
+BACKENDS = {
+    "pyautogui": PyAutoGuiPointer,
+    "xtest": XTestPointer,
+    "uinput": UInputPointer,
+    "fake": FakePointer,
+}
+
+
+def make_pointer(kind="pyautogui", coalesce=True, output_hz=0, mode="interp"):
+    backend = BACKENDS[kind]()
+    if output_hz:
+        from output_thread import InterpolatingPointer
+        out = InterpolatingPointer(backend, output_hz, mode)
+        out.start()
+        return out
+    return CoalescingPointer(backend) if coalesce else backend
+
+
+def pointer_from_argv(argv=None, default="pyautogui"):
+    # --pointer=xtest / --pointer=uinput / ...
+    # --output-hz=120 (0 disables the output thread) / --output-mode=interp|extrap
+    from output_thread import OUTPUT_HZ
+    kind, output_hz, mode = default, OUTPUT_HZ, "interp"
+    for arg in (sys.argv if argv is None else argv):
+        if arg.startswith("--pointer="):
+            kind = arg.split("=", 1)[1]
+        elif arg.startswith("--output-hz="):
+            output_hz = float(arg.split("=", 1)[1])
+        elif arg.startswith("--output-mode="):
+            mode = arg.split("=", 1)[1]
+    return make_pointer(kind, output_hz=output_hz, mode=mode)
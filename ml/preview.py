@@ -0,0 +1,179 @@
+# preview.py
+# Cached overlays and a throttled preview window for the camera scripts.
+#
+# OverlayLayer keeps chat/status text pre-rendered in its own image and only
+# redraws it when its content key changes (new chat line, other gesture
+# label); every frame it is just copied onto the preview in place.
+#
+# Preview moves cv2.imshow/waitKey off the hot loop: show() copies the frame
+# into a back buffer at most PREVIEW_FPS times a second and a render thread
+# does all highgui calls (window, imshow, waitKey, destroy). The lock only
+# covers that copy and the render thread's buffer swap; imshow draws the
+# front buffer outside it, so show() never waits for the display. Keys pressed in the
+# window come back through poll_key(). macOS only allows highgui on the main
+# thread, so there show() renders inline (still throttled).
+#
+# --headless: no window, no overlays, no preview image at all (kiosks).
+#
+#   preview = preview_from_argv("title")
+#   if preview.enabled: ...draw...; preview.show(frame)
+#   key = preview.poll_key()
+
+import sys
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+PREVIEW_FPS = 30
+PREVIEW_THREAD = sys.platform != "darwin"
+HEADLESS = "--headless" in sys.argv
+
+
+class OverlayLayer:
+    """Pre-rendered w x h overlay. opaque=True copies the whole block (e.g. a
+    filled chat box), otherwise only the pixels that were drawn."""
+
+    def __init__(self, w, h, opaque=False):
+        self.layer = np.zeros((h, w, 3), np.uint8)
+        self.mask = np.zeros((h, w), np.uint8)
+        self.opaque = opaque
+        self.key = object()
+        self.renders = 0
+
+    def update(self, key, draw):
+        # draw(layer) is only called when key differs from the last one
+        if key == self.key:
+            return False
+        self.key = key
+        self.layer.fill(0)
+        draw(self.layer)
+        if not self.opaque:
+            # anti-aliased text edges were blended with black and keep that
+            np.any(self.layer, axis=2, out=self.mask.view(bool))
+        self.renders += 1
+        return True
+
+    def blit(self, frame, x=0, y=0):
+        h = min(self.layer.shape[0], frame.shape[0] - y)
+        w = min(self.layer.shape[1], frame.shape[1] - x)
+        if h <= 0 or w <= 0:
+            return
+        dst = frame[y:y + h, x:x + w]
+        if self.opaque:
+            np.copyto(dst, self.layer[:h, :w])
+        else:
+            cv2.copyTo(self.layer[:h, :w], self.mask[:h, :w], dst)
+
+
+class Preview:
+    def __init__(self, title, max_fps=PREVIEW_FPS, threaded=PREVIEW_THREAD, tel=None):
+        self.title = title
+        self.tel = tel          # optional telemetry.Telemetry: "imshow" span
+        self.enabled = True
+        self.interval = 1.0 / max_fps if max_fps else 0.0
+        self.threaded = threaded
+        self._back = None       # written by show()
+        self._front = None      # drawn by the render thread
+        self._fresh = False
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._quit = threading.Event()
+        self._keys = deque(maxlen=16)
+        self._t_last = float("-inf")
+        self.shown = 0
+        self.skipped = 0
+        self.render_s = deque(maxlen=300)
+        self._thread = None
+        if threaded:
+            self._thread = threading.Thread(target=self._run, name="preview", daemon=True)
+            self._thread.start()
+
+    def show(self, frame):
+        """Hands the frame to the window; never waits for it to be drawn."""
+        now = time.perf_counter()
+        if now - self._t_last < self.interval:
+            self.skipped += 1
+            return
+        self._t_last = now
+        if not self.threaded:
+            self._render(frame)
+            return
+        with self._lock:
+            if self._back is None or self._back.shape != frame.shape:
+                self._back = frame.copy()
+            else:
+                np.copyto(self._back, frame)
+            self._fresh = True
+        self._ready.set()
+
+    def _render(self, frame):
+        t0 = time.perf_counter()
+        cv2.imshow(self.title, frame)
+        key = cv2.waitKey(1) & 0xFF
+        if key != 0xFF:
+            self._keys.append(key)
+        self.shown += 1
+        self.render_s.append(time.perf_counter() - t0)
+        if self.tel is not None:
+            self.tel.record("imshow", t0)
+
+    def _run(self):
+        while not self._quit.is_set():
+            if not self._ready.wait(0.05):
+                # keep the window responsive while no new frame arrives
+                if self.shown:
+                    key = cv2.waitKey(1) & 0xFF
+                    if key != 0xFF:
+                        self._keys.append(key)
+                continue
+            self._ready.clear()
+            with self._lock:
+                if not self._fresh:
+                    continue
+                self._front, self._back = self._back, self._front
+                self._fresh = False
+            self._render(self._front)
+        cv2.destroyAllWindows()
+
+    def poll_key(self):
+        try:
+            return self._keys.popleft()
+        except IndexError:
+            return -1
+
+    def close(self):
+        self._quit.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+        else:
+            cv2.destroyAllWindows()
+
+    def summary(self):
+        s = f"preview  {self.shown} shown  {self.skipped} throttled"
+        if self.render_s:
+            r = sorted(self.render_s)
+            s += f"  imshow+waitKey p50 {1000 * r[len(r) // 2]:.2f} ms  max {1000 * r[-1]:.2f} ms"
+        return s + ("  (render thread)" if self.threaded else "")
+
+
+class NullPreview:
+    enabled = False
+
+    def show(self, frame):
+        pass
+
+    def poll_key(self):
+        return -1
+
+    def close(self):
+        pass
+
+    def summary(self):
+        return "preview  headless"
+
+
+def preview_from_argv(title, tel=None):
+    return NullPreview() if HEADLESS else Preview(title, tel=tel)
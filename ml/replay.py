@@ -0,0 +1,243 @@
+# replay.py
+# Headless replay harness: runs a gesture engine on recorded landmarks or a
+# video file instead of the webcam, with mouse calls going to a recorder.
+#
+# Usage:
+#   python replay.py                                 # all ml/*.csv rows, hand engine
+#   python replay.py DRAG.csv MOVE.csv --engine basic
+#   python replay.py --video session.mp4 --trace run.json
+#   python replay.py --trace new.json --baseline run.json   # diff event traces
+#   python replay.py --raw          # no move coalescing (every engine call)
+#   python replay.py --filter oneeuro:beta=0.01     # swap the cursor filter
+#   python replay.py --check-drag   # full-width drag settles in bounded time
+
+import os
+import sys
+import csv
+import json
+import time
+import argparse
+
+from hand_frame import HandFrame
+from gesture_engine import HandMouseEngine, BasicMouseEngine, FIST_TIP_PALM
+from pointer import FakePointer, CoalescingPointer
+from cursor_filter import make_filter, parse_spec
+from dataset import CSV_FILES, GestureDataset
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+DRAG_CHECK_SETTLE_S = 1.5   # hand stops -> cursor within DRAG_CHECK_TOL of it
+DRAG_CHECK_TOL = 0.01       # fraction of the screen width
+
+
+# ================= SOURCES =================
+# Each source yields (timestamp_s, HandFrame or None) per frame.
+
+def csv_frames(paths, fps=30.0, gap=10):
+    # rows have no timestamps: assume a steady camera rate, and `gap` no-hand
+    # frames between files so each recording starts from a clean state
+    hf = HandFrame()
+    i = 0
+    for path in paths:
+        with open(path, newline="") as f:
+            for row in csv.reader(f):
+                if not row:
+                    continue
+                yield i / fps, hf.load_xy([float(v) for v in row[:42]])
+                i += 1
+        for _ in range(gap):
+            yield i / fps, None
+            i += 1
+
+
+def dataset_frames(fps=30.0, gap=10):
+    ds = GestureDataset()
+    X, sessions = ds.features(), ds.session_ids()
+    hf = HandFrame()
+    i = 0
+    for n in range(len(X)):
+        if n and sessions[n] != sessions[n - 1]:
+            for _ in range(gap):
+                yield i / fps, None
+                i += 1
+        yield i / fps, hf.load_xy(X[n])
+        i += 1
+
+
+def video_frames(path):
+    import cv2
+    import mediapipe as mp
+    cap = cv2.VideoCapture(path)
+    fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+    hf = HandFrame()
+    i = 0
+    with mp.solutions.hands.Hands(max_num_hands=1, model_complexity=1,
+                                  min_detection_confidence=0.72,
+                                  min_tracking_confidence=0.72) as hands:
+        while True:
+            ok, frame = cap.read()
+            if not ok:
+                break
+            frame = cv2.flip(frame, 1)
+            res = hands.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+            hand = res.multi_hand_landmarks[0] if res.multi_hand_landmarks else None
+            yield i / fps, (hf.load(hand) if hand is not None else None)
+            i += 1
+    cap.release()
+
+
+def drag_frames(fps=30.0, x0=0.1, x1=0.9, hold_s=1.0, sweep_s=0.5, rest_s=3.0):
+    # a recorded fist, held at x0 until the drag starts, swept to x1, held there
+    hf = HandFrame()
+    with open(os.path.join(HERE, "DRAG.csv"), newline="") as f:
+        row = next(r for r in ([float(v) for v in r[:42]] for r in csv.reader(f) if r)
+                   if hf.load_xy(r).is_fist(FIST_TIP_PALM))
+    base = hf.xy.copy()
+    anchor = (base[16] + base[24]) / 2.0        # index/middle tip midpoint, x
+    n_hold, n_sweep, n_rest = (int(round(s * fps)) for s in (hold_s, sweep_s, rest_s))
+    for i in range(n_hold + n_sweep + n_rest):
+        a = min(1.0, max(0.0, (i - n_hold) / n_sweep))
+        xy = base.copy()
+        xy[0::2] += x0 + (x1 - x0) * a - anchor
+        yield i / fps, hf.load_xy(xy)
+
+
+# ================= HARNESS =================
+def make_engine(name, mouse, ml=False, filter_spec=None):
+    w, h = mouse.size()
+    cursor_filter = None
+    if filter_spec:
+        fname, params = parse_spec(filter_spec)
+        cursor_filter = make_filter(fname, **params)
+    if name == "basic":
+        return BasicMouseEngine(mouse, w, h, cursor_filter=cursor_filter)
+    forest = None
+    if ml:
+        from forest_engine import load_forest
+        forest = load_forest()
+    engine = HandMouseEngine(mouse, w, h, forest=forest, sleep=lambda s: None,
+                             cursor_filter=cursor_filter)
+    engine.ml_mode = ml
+    return engine
+
+
+def replay(frames, engine, mouse, recorder):
+    lat = []
+    hand_frames = 0
+    t_wall = time.perf_counter()
+    for i, (t, hf) in enumerate(frames):
+        recorder.frame, recorder.t = i, t
+        t0 = time.perf_counter()
+        engine.step(hf, t)
+        mouse.flush()
+        lat.append(time.perf_counter() - t0)
+        hand_frames += hf is not None
+    t_wall = time.perf_counter() - t_wall
+    return {"frames": len(lat), "hand_frames": hand_frames, "wall_s": t_wall,
+            "decision_s": sum(lat), "latency": sorted(lat)}
+
+
+def pct(sorted_vals, p):
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(len(sorted_vals) * p / 100))]
+
+
+def report(stats, events):
+    lat = stats["latency"]
+    n = stats["frames"]
+    print(f"frames {n} ({stats['hand_frames']} with hand)")
+    print(f"replay  {n / stats['wall_s']:9.0f} frames/s (incl. source)")
+    print(f"engine  {n / max(stats['decision_s'], 1e-9):9.0f} frames/s")
+    if lat:
+        print("decision latency us: " + "  ".join(f"p{p} {1e6 * pct(lat, p):.1f}" for p in (50, 95, 99))
+              + f"  max {1e6 * lat[-1]:.1f}")
+    counts = {}
+    for e in events:
+        counts[e[2]] = counts.get(e[2], 0) + 1
+    print("events  " + "  ".join(f"{k} {v}" for k, v in sorted(counts.items())))
+
+
+def compare(events, baseline_path):
+    with open(baseline_path) as f:
+        base = json.load(f)["events"]
+    diffs = sum(1 for a, b in zip(events, base) if a != b) + abs(len(events) - len(base))
+    print(f"vs {baseline_path}: {len(base)} -> {len(events)} events, {diffs} differing")
+    for a, b in zip(events, base):
+        if a != b:
+            print(f"  first difference: baseline {b}  now {a}")
+            break
+    return diffs
+
+
+def check_drag(fps_list=(30.0, 60.0), x0=0.1, x1=0.9, hold_s=1.0, sweep_s=0.5):
+    """Full-width drag: mouse stays down, cursor reaches the hand in bounded time.
+    Returns the number of failed runs."""
+    failed = 0
+    for fps in fps_list:
+        recorder = FakePointer()
+        engine = make_engine("hand", recorder)
+        replay(drag_frames(fps, x0, x1, hold_s, sweep_s), engine, recorder, recorder)
+        names = [e[2] for e in recorder.events]
+        target = x1 * recorder.w
+        t_stop = hold_s + sweep_s
+        moves = [(e[1], e[3]) for e in recorder.events if e[2] == "moveTo" and e[1] >= t_stop]
+        settled = next((t for t, x in moves if abs(x - target) <= DRAG_CHECK_TOL * recorder.w), None)
+        ok = ("mouseDown" in names and "mouseUp" not in names and settled is not None
+              and settled - t_stop <= DRAG_CHECK_SETTLE_S)
+        failed += not ok
+        took = f"{settled - t_stop:.2f} s" if settled is not None else "never"
+        print(f"{'ok  ' if ok else 'FAIL'} drag {x0:.1f} -> {x1:.1f} in {sweep_s:.1f} s at {fps:.0f} fps: "
+              f"within {DRAG_CHECK_TOL:.0%} of the hand {took} after it stopped "
+              f"(limit {DRAG_CHECK_SETTLE_S:.1f} s), last x {moves[-1][1] if moves else None}")
+    return failed
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Replay landmark recordings through a gesture engine")
+    ap.add_argument("csv", nargs="*", help="landmark CSVs (default: ml/*.csv)")
+    ap.add_argument("--video", help="video file to run MediaPipe on instead of CSV rows")
+    ap.add_argument("--dataset", action="store_true", help="replay the binary gesture_data store")
+    ap.add_argument("--engine", choices=["hand", "basic"], default="hand",
+                    help="hand = inference_mouse.py, basic = src/v1_basic_mouse.py")
+    ap.add_argument("--ml", action="store_true", help="use gesture_model.pkl (hand engine)")
+    ap.add_argument("--fps", type=float, default=30.0, help="assumed camera rate for CSV rows")
+    ap.add_argument("--filter", help="cursor filter spec, e.g. kalman:lead=0.05 (default: engine's EMA)")
+    ap.add_argument("--raw", action="store_true", help="record every engine call, without move coalescing")
+    ap.add_argument("--trace", help="write the emitted mouse-event trace to this JSON file")
+    ap.add_argument("--baseline", help="compare against a trace written by an earlier run")
+    ap.add_argument("--check-drag", action="store_true",
+                    help="synthetic full-width drag must settle within DRAG_CHECK_SETTLE_S (exit 1 if not)")
+    args = ap.parse_args()
+
+    if args.check_drag:
+        sys.exit(1 if check_drag() else 0)
+
+    if args.video:
+        frames, source = video_frames(args.video), args.video
+    elif args.dataset:
+        frames, source = dataset_frames(args.fps), "gesture_data"
+    else:
+        paths = args.csv or [os.path.join(HERE, f) for f in CSV_FILES]
+        frames, source = csv_frames(paths, args.fps), paths
+
+    recorder = FakePointer()
+    mouse = recorder if args.raw else CoalescingPointer(recorder)
+    engine = make_engine(args.engine, mouse, args.ml, args.filter)
+    stats = replay(frames, engine, mouse, recorder)
+    report(stats, recorder.events)
+    print(engine.fsm.summary())
+    if not args.raw:
+        print(f"coalesced: merged {mouse.merged}  skipped {mouse.skipped} unchanged moves")
+
+    if args.trace:
+        with open(args.trace, "w") as f:
+            json.dump({"source": source, "engine": args.engine, "ml": args.ml,
+                       "raw": args.raw, "events": recorder.events}, f)
+        print(f"trace written to {args.trace}")
+    if args.baseline:
+        sys.exit(1 if compare(recorder.events, args.baseline) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+# roi_hands.py
+# ROI-cropped, downscaled hand inference driven by the previous landmarks.
+#
+# While a hand is tracked, only a padded square around last frame's
+# landmarks is resized to a fixed ROI_SIZE image and sent to MediaPipe; the
+# landmarks are then mapped back to full-frame normalized coordinates in
+# place. When the hand is lost in the crop, the same frame gets a full-frame
+# pass. RoiHands.process() is a drop-in for Hands.process().
+#
+# MediaPipe in video mode tracks the hand from its previous landmarks, in
+# the coordinates of the previous input image. A crop at another place (or
+# the full frame after a crop) would hand it a prior that points at the wrong
+# pixels, so the box is sticky: it only moves when the hand gets within
+# ROI_KEEP_INSET of its edge or changes size by more than ROI_RESIZE, and
+# every change of input frame resets the graph, so the next pass re-detects
+# the palm in the new crop. bench_roi.py reports how often that happens and
+# the landmark error against full-frame inference.
+#
+# When FlowHands wraps RoiHands, the flow-tracked landmarks are passed to
+# follow() so the box keeps up with the hand between detections.
+
+import cv2
+import numpy as np
+
+ROI_SIZE = 224      # fixed inference input (pixels, square)
+ROI_PAD = 0.35      # padding around the landmark box, relative to its size
+ROI_MIN_SIDE = 96   # never crop tighter than this many source pixels
+ROI_KEEP_INSET = 0.1    # box stays while the hand is this far (x side) inside it
+ROI_RESIZE = 0.25       # ...and its wanted side is within this ratio of the box
+
+
+class RoiHands:
+    def __init__(self, hands, size=ROI_SIZE, pad=ROI_PAD, min_side=ROI_MIN_SIDE):
+        self.hands = hands
+        self.size = size
+        self.pad = pad
+        self.min_side = min_side
+        self.box = None                     # (x0, y0, side) in source pixels
+        self._box_wh = None                 # frame size the box was computed for
+        self._input = None                  # what the graph saw last: a box or "full"
+        self._buf = np.zeros((size, size, 3), np.uint8)
+        self.roi_frames = 0
+        self.full_frames = 0
+        self.lost = 0                       # ROI passes that fell back to full frame
+        self.moves = 0                      # box changes
+        self.resets = 0                     # graph resets for a new input frame
+
+    def process(self, rgb):
+        H, W = rgb.shape[:2]
+        if self.box is not None and self._box_wh != (W, H):
+            # frame size changed (e.g. a downscaled probe frame): rescale the box
+            k = W / self._box_wh[0]
+            x0, y0, side = self.box
+            side = min(int(side * k), W, H)
+            self.box = (min(int(x0 * k), W - side), min(int(y0 * k), H - side), side)
+            self._box_wh = (W, H)
+        if self.box is not None:
+            x0, y0, side = self.box
+            crop = rgb[y0:y0 + side, x0:x0 + side]
+            cv2.resize(crop, (self.size, self.size), dst=self._buf, interpolation=cv2.INTER_AREA)
+            res = self._process(self._buf, self.box)
+            self.roi_frames += 1
+            if res.multi_hand_landmarks:
+                sx, sy = side / W, side / H
+                ox, oy = x0 / W, y0 / H
+                for hand in res.multi_hand_landmarks:
+                    for l in hand.landmark:
+                        l.x = ox + l.x * sx
+                        l.y = oy + l.y * sy
+                        l.z = l.z * sx
+                self._track(res, W, H)
+                return res
+            self.lost += 1
+
+        res = self._process(rgb, "full")
+        self.full_frames += 1
+        self._track(res, W, H)
+        return res
+
+    def _process(self, img, key):
+        # the tracking prior is only valid for the same input frame
+        if key != self._input:
+            if self._input is not None and hasattr(self.hands, "reset"):
+                self.hands.reset()
+                self.resets += 1
+            self._input = key
+        return self.hands.process(img)
+
+    def follow(self, res, shape):
+        """Update the box from landmarks found elsewhere (e.g. optical flow)."""
+        H, W = shape[:2]
+        self._track(res, W, H)
+
+    def _track(self, res, W, H):
+        if not res.multi_hand_landmarks:
+            self.box = None
+            return
+        lm = res.multi_hand_landmarks[0].landmark
+        xs = [l.x for l in lm]
+        ys = [l.y for l in lm]
+        bx0, bx1 = min(xs) * W, max(xs) * W
+        by0, by1 = min(ys) * H, max(ys) * H
+        side = max(bx1 - bx0, by1 - by0) * (1.0 + 2.0 * self.pad)
+        side = int(min(max(side, self.min_side), W, H))
+        if self.box is not None and self._box_wh == (W, H):
+            # sticky: keep the crop (and MediaPipe's tracking) while the hand
+            # is well inside it and about the same size
+            x0, y0, cur = self.box
+            inset = ROI_KEEP_INSET * cur
+            if (x0 + inset <= bx0 and bx1 <= x0 + cur - inset and y0 + inset <= by0
+                    and by1 <= y0 + cur - inset and abs(side / cur - 1.0) <= ROI_RESIZE):
+                return
+        cx, cy = (bx0 + bx1) / 2.0, (by0 + by1) / 2.0
+        # keep the square inside the frame instead of shrinking it
+        x0 = int(min(max(cx - side / 2.0, 0), W - side))
+        y0 = int(min(max(cy - side / 2.0, 0), H - side))
+        self.box = (x0, y0, side)
+        self._box_wh = (W, H)
+        self.moves += 1
+
+    def reset(self):
+        self.box = None
+
+    def summary(self):
+        total = self.roi_frames + self.full_frames - self.lost
+        return (f"roi      {self.roi_frames - self.lost} of {total} frames cropped  "
+                f"full {self.full_frames}  lost {self.lost}  box moves {self.moves}  "
+                f"graph resets {self.resets}")
@@ -0,0 +1,95 @@
+# scheduler.py
+# Adaptive frame-rate scheduler for idle vs. active hand tracking.
+#
+# ACTIVE: every camera frame is decoded, run through MediaPipe and shown.
+# IDLE:   after IDLE_AFTER_S without a hand, only one "presence probe" frame
+#         every PROBE_INTERVAL_S is decoded, downscaled by PROBE_SCALE and
+#         run through MediaPipe; the frames in between are grabbed without
+#         decoding so the camera buffer stays fresh. The first probe that sees
+#         a hand switches straight back to ACTIVE, so the next frame already
+#         runs at full rate and full resolution.
+#
+# Metrics: process CPU seconds per wall second (per mode) and wake-up latency,
+# i.e. the time from the last empty probe to the first full-rate frame, which
+# bounds how long a hand waited before being tracked again.
+
+import time
+from collections import deque
+
+import cv2
+
+IDLE_AFTER_S = 3.0
+PROBE_INTERVAL_S = 0.25
+PROBE_SCALE = 0.5
+
+
+class AdaptiveScheduler:
+    def __init__(self, idle_after=IDLE_AFTER_S, probe_interval=PROBE_INTERVAL_S,
+                 probe_scale=PROBE_SCALE):
+        self.idle_after = idle_after
+        self.probe_interval = probe_interval
+        self.probe_scale = probe_scale
+        now = time.perf_counter()
+        self.active = True
+        self.last_hand = now
+        self.last_probe = 0.0
+        self.wake_pending = None        # time of the last empty probe before a wake
+        self.wake_latency = deque(maxlen=100)
+        self.probes = 0
+        self.skipped = 0
+        # CPU accounting, sampled about once per second
+        self._cpu_t, self._cpu_c = now, time.process_time()
+        self.cpu_per_s = {"active": deque(maxlen=60), "idle": deque(maxlen=60)}
+
+    def due(self, now):
+        """True if this frame should be decoded and run through inference."""
+        self._sample_cpu(now)
+        if self.active or now - self.last_probe >= self.probe_interval:
+            return True
+        self.skipped += 1
+        return False
+
+    def prepare(self, rgb):
+        # probe frames run at reduced resolution; landmarks are normalized anyway
+        if self.active or self.probe_scale >= 1.0:
+            return rgb
+        return cv2.resize(rgb, None, fx=self.probe_scale, fy=self.probe_scale,
+                          interpolation=cv2.INTER_AREA)
+
+    def observe(self, hand_seen, now):
+        """Report whether the processed frame had a hand."""
+        if self.active:
+            if self.wake_pending is not None:
+                self.wake_latency.append(now - self.wake_pending)
+                self.wake_pending = None
+            if hand_seen:
+                self.last_hand = now
+            elif now - self.last_hand > self.idle_after:
+                self.active = False
+                self.last_probe = now
+            return
+        self.probes += 1
+        if hand_seen:
+            self.active = True
+            self.last_hand = now
+            self.wake_pending = self.last_probe
+        self.last_probe = now
+
+    def _sample_cpu(self, now):
+        if now - self._cpu_t < 1.0:
+            return
+        cpu = time.process_time()
+        self.cpu_per_s["active" if self.active else "idle"].append(
+            (cpu - self._cpu_c) / (now - self._cpu_t))
+        self._cpu_t, self._cpu_c = now, cpu
+
+    def summary(self):
+        def avg(d):
+            return sum(d) / len(d) if d else 0.0
+        s = (f"sched    {'ACTIVE' if self.active else 'IDLE'}  probes {self.probes}  "
+             f"skipped {self.skipped}  cpu/s active {avg(self.cpu_per_s['active']):.2f} "
+             f"idle {avg(self.cpu_per_s['idle']):.2f}")
+        if self.wake_latency:
+            s += (f"  wake avg {1000 * avg(self.wake_latency):.0f} ms "
+                  f"max {1000 * max(self.wake_latency):.0f} ms")
+        return s
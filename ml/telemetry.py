@@ -0,0 +1,198 @@
+# telemetry.py
+# Per-stage latency histograms and counters for the camera loops.
+#
+# Hot path is one perf_counter() and one bisect per stage:
+#   t = tel.now()
+#   ok = cap.read()
+#   t = tel.record("cap.read", t)       # records now - t, returns now
+#   res = hands.process(img)
+#   t = tel.record("hands.process", t)
+#   tel.count("frames")
+#
+# Histograms have fixed log-spaced buckets (BUCKETS, 50 us .. 2 s, about
+# 20% wide), so recording never allocates and p50/p95/p99 are interpolated
+# inside a bucket. Each stage should be recorded from one thread only.
+#
+# Export (both optional, off the hot path):
+#   --metrics=FILE        JSON snapshot rewritten every DUMP_EVERY_S
+#   --metrics-port=PORT   Prometheus text on http://127.0.0.1:PORT/metrics
+# --no-telemetry turns recording off (record() still returns the time).
+
+import os
+import sys
+import json
+import time
+import threading
+from bisect import bisect_left
+
+BUCKETS = [50e-6 * 1.2 ** i for i in range(60)]     # upper bounds in seconds
+DUMP_EVERY_S = 5.0
+PREFIX = "gesture_mouse"
+QUANTILES = (0.5, 0.95, 0.99)
+
+
+class Histogram:
+    __slots__ = ("counts", "total", "n", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)      # last bucket: > BUCKETS[-1]
+        self.total = 0.0
+        self.n = 0
+        self.max = 0.0
+
+    def observe(self, v):
+        self.counts[bisect_left(BUCKETS, v)] += 1
+        self.total += v
+        self.n += 1
+        if v > self.max:
+            self.max = v
+
+    def quantile(self, q):
+        if not self.n:
+            return 0.0
+        rank = q * self.n
+        seen = 0
+        for i, c in enumerate(self.counts):
+            if c and seen + c >= rank:
+                lo = BUCKETS[i - 1] if i else 0.0
+                hi = BUCKETS[i] if i < len(BUCKETS) else self.max
+                return min(lo + (hi - lo) * (rank - seen) / c, self.max)
+            seen += c
+        return self.max
+
+
+class Telemetry:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.spans = {}
+        self.counters = {}
+        self.t0 = time.perf_counter()
+        self._quit = threading.Event()
+        self._server = None
+
+    now = staticmethod(time.perf_counter)
+
+    def record(self, stage, t0):
+        t = time.perf_counter()
+        if self.enabled:
+            h = self.spans.get(stage)
+            if h is None:
+                h = self.spans[stage] = Histogram()
+            h.observe(t - t0)
+        return t
+
+    def observe(self, stage, seconds):
+        if self.enabled:
+            h = self.spans.get(stage)
+            if h is None:
+                h = self.spans[stage] = Histogram()
+            h.observe(seconds)
+
+    def count(self, name, n=1, label=None):
+        if self.enabled and n:
+            key = (name, label)
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    # ================= EXPORT =================
+
+    def snapshot(self):
+        spans = {}
+        for stage, h in list(self.spans.items()):
+            spans[stage] = {"count": h.n, "sum_s": h.total, "max_s": h.max}
+            for q in QUANTILES:
+                spans[stage][f"p{int(q * 100)}_s"] = h.quantile(q)
+        counters = {}
+        for (name, label), v in list(self.counters.items()):
+            counters[name if label is None else f"{name}.{label}"] = v
+        return {"uptime_s": time.perf_counter() - self.t0, "spans": spans, "counters": counters}
+
+    def dump(self, path):
+        tmp = path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.snapshot(), f, indent=1)
+        os.replace(tmp, path)       # readers never see a half-written file
+
+    def prometheus(self):
+        lines = [f"# TYPE {PREFIX}_stage_seconds histogram"]
+        for stage, h in list(self.spans.items()):
+            counts = list(h.counts)
+            acc = 0
+            for bound, c in zip(BUCKETS, counts):
+                acc += c
+                lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="{bound:.6g}"}} {acc}')
+            lines.append(f'{PREFIX}_stage_seconds_bucket{{stage="{stage}",le="+Inf"}} {acc + counts[-1]}')
+            lines.append(f'{PREFIX}_stage_seconds_sum{{stage="{stage}"}} {h.total:.9f}')
+            lines.append(f'{PREFIX}_stage_seconds_count{{stage="{stage}"}} {acc + counts[-1]}')
+        seen = set()
+        for (name, label), v in sorted(self.counters.items(), key=lambda kv: (kv[0][0], kv[0][1] or "")):
+            metric = f"{PREFIX}_{name}_total"
+            if metric not in seen:
+                seen.add(metric)
+                lines.append(f"# TYPE {metric} counter")
+            lines.append(f'{metric}{{kind="{label}"}} {v}' if label else f"{metric} {v}")
+        return "\n".join(lines) + "\n"
+
+    def start(self, path=None, port=None, every=DUMP_EVERY_S):
+        if path:
+            threading.Thread(target=self._dump_loop, args=(path, every),
+                             name="telemetry", daemon=True).start()
+        if port:
+            self._serve(port)
+        return self
+
+    def _dump_loop(self, path, every):
+        while not self._quit.wait(every):
+            self.dump(path)
+        self.dump(path)
+
+    def _serve(self, port):
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        tel = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = tel.prometheus().encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        # localhost only: the metrics are not meant to leave the machine
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        print(f"Metrics on http://127.0.0.1:{port}/metrics")
+
+    def close(self):
+        self._quit.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def summary(self):
+        lines = ["telemetry (ms)      count      p50      p95      p99      max"]
+        for stage, h in self.spans.items():
+            lines.append(f"  {stage:<16} {h.n:7d} " + " ".join(
+                f"{1000 * v:8.2f}" for v in (h.quantile(0.5), h.quantile(0.95), h.quantile(0.99), h.max)))
+        if self.counters:
+            lines.append("  " + "  ".join(f"{name if label is None else f'{name}.{label}'} {v}"
+                                          for (name, label), v in self.counters.items()))
+        return "\n".join(lines)
+
+
+def telemetry_from_argv(argv=None):
+    argv = sys.argv if argv is None else argv
+    path = port = None
+    for arg in argv:
+        if arg.startswith("--metrics="):
+            path = arg.split("=", 1)[1]
+        elif arg.startswith("--metrics-port="):
+            port = int(arg.split("=", 1)[1])
+    return Telemetry(enabled="--no-telemetry" not in argv).start(path, port)
@@ -1,31 +1,261 @@
-import pandas as pd
-from sklearn.ensemble import RandomForestClassifier
-from sklearn.model_selection import train_test_split
+# train_model.py
+# Trains gesture_model.pkl: stratified k-fold model search on all cores,
+# then the fastest model that is accurate enough for real-time control.
+#
+# Every candidate (model family + hyperparameters in CANDIDATES) is scored
+# with FOLDS-fold stratified cross-validation; each (candidate, fold) fit is
+# one job on a process pool. Candidates are tree ensembles only, because the
+# mouse loop runs the model through FlatForest (forest_engine.py).
+# Single-sample FlatForest latency is then timed in this process, one
+# candidate at a time, so the numbers are not skewed by the pool's load.
+#
+# Selection: the Pareto front over (cv accuracy up, latency down); the
+# chosen model is the fastest one whose cv accuracy is at least the target
+# (--target-acc, default: best cv accuracy - ACC_TOLERANCE). It is refit on
+# the training split, checked on the held-out split and saved; everything
+# goes to train_report.json.
+#
+# Features: by default the model is trained on features.py features (wrist-
+# relative, palm-normalized, fingertip distances, joint bends), cached on disk
+# per data hash + spec version; the spec is stored in the model as
+# feature_spec_ and FlatForest applies it at runtime. --features=raw trains on
+# the 42 landmark coordinates as before.
+#
+# Usage:
+#   python train_model.py [--folds=5] [--workers=N] [--target-acc=0.98]
+#                         [--features=hand|raw]
+#                         [--out=gesture_model.pkl] [--report=train_report.json]
+
+import os
+import sys
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
 import joblib
+from sklearn.ensemble import RandomForestClassifier, ExtraTreesClassifier
+from sklearn.tree import DecisionTreeClassifier
+from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 
-# Load data
-files = ["MOVE.csv", "LEFT_CLICK.csv", "RIGHT_CLICK.csv", "DRAG.csv"]
-data = []
+from dataset import GestureDataset, import_csvs
+from forest_engine import FlatForest
+import features
 
-for file in files:
-    df = pd.read_csv(file, header=None)
-    data.append(df)
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODEL_OUT = os.path.join(HERE, "gesture_model.pkl")
+REPORT_OUT = os.path.join(HERE, "train_report.json")
 
-data = pd.concat(data, ignore_index=True)
+FOLDS = 5
+TEST_SIZE = 0.2
+SEED = 42
+ACC_TOLERANCE = 0.005       # default target: within half a point of the best model
+LATENCY_SAMPLES = 300
 
-X = data.iloc[:, :-1]   # features
-y = data.iloc[:, -1]    # labels
+FAMILIES = {
+    "forest": RandomForestClassifier,
+    "extra": ExtraTreesClassifier,
+    "tree": DecisionTreeClassifier,
+}
 
-# Train-test split
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
+# (family, params); the first row is the old default model
+CANDIDATES = (
+    [("forest", {"n_estimators": 100})]
+    + [("forest", {"n_estimators": n, "max_depth": d})
+       for n in (5, 10, 25, 50) for d in (None, 8, 12)]
+    + [("extra", {"n_estimators": n, "max_depth": d})
+       for n in (5, 10, 25, 50, 100) for d in (None, 12)]
+    + [("tree", {"max_depth": d}) for d in (None, 6, 8, 12)]
 )
 
-# Train model
-model = RandomForestClassifier(n_estimators=100, random_state=42)
-model.fit(X_train, y_train)
 
-# Save model
-joblib.dump(model, "gesture_model.pkl")
+def arg_value(name, default):
+    for arg in sys.argv[1:]:
+        if arg.startswith(f"--{name}="):
+            return type(default)(arg.split("=", 1)[1]) if default is not None else arg.split("=", 1)[1]
+    return default
+
+
+def make_model(family, params):
+    return FAMILIES[family](random_state=SEED, **params)
+
+
+def load_data():
+    # Load data (binary store; the first run imports the recorded CSVs)
+    ds = GestureDataset()
+    if len(ds) == 0:
+        import_csvs(ds)
+    X = ds.features()        # raw landmark rows (memory-mapped float32)
+    y = ds.label_names()     # labels
+    return X, y
+
+
+def model_inputs(X, spec, verbose=False):
+    # cached feature matrix (memory-mapped) or the raw rows
+    return features.cached_transform(X, verbose=verbose) if spec else X
+
+
+# ================= POOL JOBS =================
+# Workers re-open the memory-mapped store instead of receiving X by pickle.
+
+_data = None
+
+
+def init_worker(train_idx, spec):
+    global _data
+    X, y = load_data()
+    F = model_inputs(X, spec)       # cache hit: the parent computed it
+    _data = np.asarray(F[train_idx]), y[train_idx]
+
+
+def fit_fold(job):
+    cid, family, params, fold, fit_rows, val_rows, keep = job
+    X, y = _data
+    t0 = time.perf_counter()
+    model = make_model(family, params).fit(X[fit_rows], y[fit_rows])
+    fit_s = time.perf_counter() - t0
+    acc = accuracy_score(y[val_rows], model.predict(X[val_rows]))
+    # one fitted model per candidate comes back for the latency measurement
+    return cid, fold, acc, fit_s, (model if keep else None)
+
+
+# ================= SELECTION =================
+
+def single_sample_latency(model, X, n=LATENCY_SAMPLES):
+    # X: raw rows, so feature extraction is part of the measured time
+    flat = FlatForest(model)
+    rows = X[np.linspace(0, len(X) - 1, min(n, len(X))).astype(int)]
+    for x in rows[:20]:
+        flat.predict_proba_one(x)           # warm-up
+    times = []
+    for x in rows:
+        t0 = time.perf_counter()
+        flat.predict_proba_one(x)
+        times.append(time.perf_counter() - t0)
+    t = np.sort(times)
+    nodes = int(sum(e.tree_.node_count for e in getattr(model, "estimators_", [model])))
+    return float(np.median(t)), float(t[int(0.95 * (len(t) - 1))]), nodes
+
+
+def pareto_front(cands):
+    # not dominated: no other candidate is at least as accurate and at least as fast, and better in one
+    front = []
+    for c in cands:
+        dominated = any(
+            o["cv_acc"] >= c["cv_acc"] and o["latency_us"] <= c["latency_us"]
+            and (o["cv_acc"] > c["cv_acc"] or o["latency_us"] < c["latency_us"])
+            for o in cands)
+        if not dominated:
+            front.append(c)
+    return sorted(front, key=lambda c: c["latency_us"])
+
+
+def main():
+    folds = arg_value("folds", FOLDS)
+    workers = arg_value("workers", os.cpu_count() or 1)
+    target = arg_value("target-acc", 0.0)
+    out = arg_value("out", MODEL_OUT)
+    report_path = arg_value("report", REPORT_OUT)
+    spec = None if arg_value("features", "hand") == "raw" else features.SPEC
+    t_start = time.perf_counter()
+
+    X, y = load_data()
+    t_feat = time.perf_counter()
+    F = model_inputs(X, spec, verbose=True)
+    feat_s = time.perf_counter() - t_feat
+    idx = np.arange(len(y))
+    train_idx, test_idx = train_test_split(idx, test_size=TEST_SIZE, random_state=SEED, stratify=y)
+    train_idx.sort()
+    test_idx.sort()
+    y_train = y[train_idx]
+    print(f"{len(y)} samples x {F.shape[1]} features ({spec['name'] if spec else 'raw'}), "
+          f"{len(set(y))} classes: {len(train_idx)} train / {len(test_idx)} test")
+
+    # ---------- cross-validation on the pool ----------
+    skf = StratifiedKFold(n_splits=folds, shuffle=True, random_state=SEED)
+    splits = list(skf.split(np.zeros(len(y_train)), y_train))
+    jobs = [(cid, family, params, k, fit_rows, val_rows, k == 0)
+            for cid, (family, params) in enumerate(CANDIDATES)
+            for k, (fit_rows, val_rows) in enumerate(splits)]
+    print(f"{len(CANDIDATES)} candidates x {folds} folds = {len(jobs)} fits on {workers} workers")
+
+    accs = {cid: [] for cid in range(len(CANDIDATES))}
+    fit_times = {cid: [] for cid in range(len(CANDIDATES))}
+    models = {}
+    t_cv = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(train_idx, spec)) as pool:
+        for cid, fold, acc, fit_s, model in pool.map(fit_fold, jobs, chunksize=max(1, len(jobs) // (4 * workers))):
+            accs[cid].append(acc)
+            fit_times[cid].append(fit_s)
+            if model is not None:
+                model.feature_spec_ = spec
+                models[cid] = model
+    cv_s = time.perf_counter() - t_cv
+
+    # ---------- latency, serially ----------
+    X_test = np.asarray(X[test_idx])
+    cands = []
+    for cid, (family, params) in enumerate(CANDIDATES):
+        p50, p95, nodes = single_sample_latency(models[cid], X_test)
+        cands.append({
+            "id": cid, "family": family, "params": params,
+            "cv_acc": float(np.mean(accs[cid])), "cv_std": float(np.std(accs[cid])),
+            "fit_s": float(np.mean(fit_times[cid])),
+            "latency_us": 1e6 * p50, "latency_p95_us": 1e6 * p95, "nodes": nodes,
+        })
+
+    front = pareto_front(cands)
+    best_acc = max(c["cv_acc"] for c in cands)
+    target = target or best_acc - ACC_TOLERANCE
+    ok = [c for c in front if c["cv_acc"] >= target] or [max(front, key=lambda c: c["cv_acc"])]
+    chosen = min(ok, key=lambda c: c["latency_us"])
+    for c in cands:
+        c["pareto"] = c in front
+
+    print(f"\n{'candidate':<52} {'cv acc':>8} {'+-':>6} {'lat us':>8} {'nodes':>7}")
+    for c in sorted(cands, key=lambda c: -c["cv_acc"]):
+        mark = "*" if c is chosen else ("p" if c["pareto"] else " ")
+        print(f"{mark} {c['family'] + ' ' + json.dumps(c['params']):<50} {c['cv_acc']:8.4f} "
+              f"{c['cv_std']:6.4f} {c['latency_us']:8.1f} {c['nodes']:7d}")
+
+    # ---------- final fit + held-out check ----------
+    model = make_model(chosen["family"], chosen["params"])
+    model.fit(np.asarray(F[train_idx]), y_train)
+    y_pred = model.predict(np.asarray(F[test_idx]))
+    test_acc = accuracy_score(y[test_idx], y_pred)
+    # the model bundle records how its inputs were computed (None = raw)
+    model.feature_spec_ = spec
+    # written next to the target and renamed: a running mouse process
+    # (model_manager.py) never sees a half-written model
+    tmp = out + ".tmp"
+    joblib.dump(model, tmp)
+    os.replace(tmp, out)
+
+    report = {
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "samples": int(len(y)), "train": int(len(train_idx)), "test": int(len(test_idx)),
+        "features": spec, "n_features": int(F.shape[1]), "features_s": feat_s,
+        "folds": folds, "workers": workers, "cv_wall_s": cv_s,
+        "target_acc": target,
+        "chosen": chosen,
+        "test_acc": float(test_acc),
+        "per_class": classification_report(y[test_idx], y_pred, output_dict=True, zero_division=0),
+        "confusion": {"labels": [str(c) for c in model.classes_],
+                      "matrix": confusion_matrix(y[test_idx], y_pred, labels=model.classes_).tolist()},
+        "pareto": [c["id"] for c in front],
+        "candidates": cands,
+        "wall_s": time.perf_counter() - t_start,
+    }
+    with open(report_path, "w") as f:
+        json.dump(report, f, indent=1)
+
+    print(f"\nchosen: {chosen['family']} {json.dumps(chosen['params'])}  "
+          f"cv {chosen['cv_acc']:.4f} (target {target:.4f})  test {test_acc:.4f}  "
+          f"{chosen['latency_us']:.1f} us/sample")
+    print(f"cv {cv_s:.1f} s on {workers} workers, total {report['wall_s']:.1f} s")
+    print(f"Model trained and saved as {os.path.basename(out)}; report in {os.path.basename(report_path)}")
+
 
-print("Model trained and saved as gesture_model.pkl")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,410 @@
+# voice.py
+# Offline streaming voice pipeline: noise floor -> energy VAD -> wake word -> command.
+#
+# Audio arrives as FRAME_MS frames of 16 kHz mono int16 (microphone or WAV).
+#   NoiseFloor  persistent background level in dBFS (no per-utterance
+#               adjust_for_ambient_noise): seeded from the first
+#               NOISE_SEED_MS, then minimum statistics - the quietest frame
+#               of the last NOISE_WINDOW_S is background, even while speech
+#               is going on, so a louder room raises the floor within seconds
+#   EnergyVad   speech starts after VAD_START_MS above floor + VAD_MARGIN_DB
+#               and ends after VAD_END_MS below it; PREROLL_MS of audio
+#               before the start is kept so the first syllable isn't cut
+#   wake word   a tiny grammar recognizer (WAKE_WORD + [unk]) runs on speech
+#               frames only; the full command recognizer is fed just the
+#               utterances that contain the wake word
+#
+# Recognition uses vosk (pip install vosk, plus a model directory from
+# https://alphacephei.com/vosk/models, e.g. vosk-model-small-en-us-0.15) and
+# never touches the network. Without vosk the VAD still runs, which is what
+# `python voice.py test.wav` reports.
+#
+# Latency: wake->action is audio time from the wake word being spotted to the
+# end of the command utterance, plus the recognizer's finalize time.
+#
+# Usage:
+#   python voice.py recording.wav [more.wav ...] [--model PATH]
+#   python voice.py --check         # VAD on synthetic noise, exit 1 on failure
+
+import os
+import sys
+import json
+import time
+import wave
+from collections import deque
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MODEL_DIR = os.environ.get("VOSK_MODEL", os.path.join(HERE, "vosk-model"))
+
+SAMPLE_RATE = 16000
+FRAME_MS = 30
+FRAME = SAMPLE_RATE * FRAME_MS // 1000
+WAKE_WORD = "alpha"
+
+NOISE_INIT_DB = -60.0
+NOISE_SEED_MS = 300         # floor = median of the first frames, no speech before
+NOISE_WINDOW_S = 2.0        # minimum-statistics window, longer than any word
+NOISE_RISE = 0.02           # per-frame step towards louder background
+NOISE_FALL = 0.3            # per-frame step towards quieter background
+VAD_MARGIN_DB = 10.0
+VAD_START_MS = 90
+VAD_END_MS = 450
+PREROLL_MS = 240
+MAX_UTTERANCE_S = 8.0
+COMMAND_WINDOW_S = 4.0      # "alpha" <pause> "open github" still counts
+
+
+def frame_db(pcm):
+    # RMS level in dBFS of an int16 frame
+    x = pcm.astype(np.float32)
+    rms = np.sqrt(np.mean(x * x)) / 32768.0
+    return 20.0 * np.log10(max(rms, 1e-6))
+
+
+class NoiseFloor:
+    """Fed every frame. Speech has gaps between words, so the window minimum
+    stays at the background level during it; a steady louder background
+    lifts the minimum and the floor follows it slowly."""
+
+    def __init__(self, init_db=NOISE_INIT_DB, rise=NOISE_RISE, fall=NOISE_FALL,
+                 window_s=NOISE_WINDOW_S, seed_ms=NOISE_SEED_MS):
+        self.db = init_db
+        self.rise = rise
+        self.fall = fall
+        self.window = deque(maxlen=max(1, int(window_s * 1000) // FRAME_MS))
+        self.seed_n = max(1, seed_ms // FRAME_MS)
+        self.seeded = False
+
+    def update(self, db):
+        self.window.append(db)
+        if not self.seeded:
+            if len(self.window) >= self.seed_n:
+                self.db = float(np.median(self.window))
+                self.seeded = True
+            return
+        target = min(self.window)
+        k = self.rise if target > self.db else self.fall
+        self.db += k * (target - self.db)
+
+
+class EnergyVad:
+    """Feed frames in order; returns "start", "end" or None per frame."""
+
+    def __init__(self, floor=None, margin_db=VAD_MARGIN_DB,
+                 start_ms=VAD_START_MS, end_ms=VAD_END_MS, preroll_ms=PREROLL_MS):
+        self.floor = floor or NoiseFloor()
+        self.margin = margin_db
+        self.start_n = max(1, start_ms // FRAME_MS)
+        self.end_n = max(1, end_ms // FRAME_MS)
+        self.preroll = deque(maxlen=max(1, preroll_ms // FRAME_MS))
+        self.speech = False
+        self._above = 0
+        self._below = 0
+        self.t_start = 0.0
+        self.db = NOISE_INIT_DB
+
+    def process(self, pcm, t):
+        db = self.db = frame_db(pcm)
+        self.floor.update(db)
+        if not self.floor.seeded:
+            self.preroll.append(pcm)
+            return None
+        loud = db > self.floor.db + self.margin
+        if not self.speech:
+            self.preroll.append(pcm)
+            if loud:
+                self._above += 1
+                if self._above >= self.start_n:
+                    self.speech = True
+                    self._below = 0
+                    self.t_start = t - (len(self.preroll) - 1) * FRAME_MS / 1000.0
+                    return "start"
+            else:
+                self._above = 0
+            return None
+        self._below = 0 if loud else self._below + 1
+        if self._below >= self.end_n or t - self.t_start > MAX_UTTERANCE_S:
+            self.speech = False
+            self._above = 0
+            self.preroll.clear()
+            return "end"
+        return None
+
+
+class VoskRecognizer:
+    """Thin wrapper: accept(pcm) / partial() / final() / reset()."""
+
+    _models = {}
+
+    def __init__(self, model_path=MODEL_DIR, grammar=None):
+        from vosk import Model, KaldiRecognizer, SetLogLevel
+        SetLogLevel(-1)
+        model = self._models.get(model_path)
+        if model is None:
+            model = self._models[model_path] = Model(model_path)
+        if grammar:
+            self._rec = KaldiRecognizer(model, SAMPLE_RATE, json.dumps(grammar))
+        else:
+            self._rec = KaldiRecognizer(model, SAMPLE_RATE)
+        self._text = []
+
+    def accept(self, pcm):
+        if self._rec.AcceptWaveform(pcm.tobytes()):
+            self._text.append(json.loads(self._rec.Result()).get("text", ""))
+
+    def partial(self):
+        return " ".join(self._text + [json.loads(self._rec.PartialResult()).get("partial", "")]).strip()
+
+    def final(self):
+        self._text.append(json.loads(self._rec.FinalResult()).get("text", ""))
+        text = " ".join(t for t in self._text if t).strip()
+        self._text = []
+        return text
+
+    def reset(self):
+        self._rec.Reset()
+        self._text = []
+
+
+def offline_available(model_path=MODEL_DIR):
+    try:
+        import vosk  # noqa: F401
+    except ImportError:
+        return False
+    return os.path.isdir(model_path)
+
+
+class VoiceListener:
+    """Streaming wake-word + command pipeline.
+
+    on_command(text) is called with the command (wake word removed);
+    on_status(text) gets "Listening..." / "Wake word" style UI messages.
+    """
+
+    def __init__(self, on_command, on_status=None, wake_word=WAKE_WORD,
+                 model_path=MODEL_DIR, recognizers=True):
+        self.on_command = on_command
+        self.on_status = on_status or (lambda text: None)
+        self.wake_word = wake_word
+        self.vad = EnergyVad()
+        self.wake = self.cmd = None
+        if recognizers:
+            self.wake = VoskRecognizer(model_path, [wake_word, "[unk]"])
+            self.cmd = VoskRecognizer(model_path)
+        self.utterance = []         # frames of the current utterance (incl. preroll)
+        self.awake_until = -1.0     # command window after a bare wake word
+        self.t_wake = None
+        self.feeding_cmd = False
+        # stats
+        self.utterances = 0
+        self.wakes = 0
+        self.commands = 0
+        self.segments = []          # (start, end) audio seconds
+        self.wake_to_action = deque(maxlen=100)
+        self.end_to_action = deque(maxlen=100)
+
+    def feed(self, pcm, t):
+        ev = self.vad.process(pcm, t)
+        if ev == "start":
+            self.utterances += 1
+            self.utterance = list(self.vad.preroll)
+            self.feeding_cmd = t <= self.awake_until
+            if self.feeding_cmd:
+                self.t_wake = self.t_wake if self.t_wake is not None else t
+                self._feed_cmd(self.utterance)
+            elif self.wake is not None:
+                for f in self.utterance:
+                    self.wake.accept(f)
+            return
+        if not self.vad.speech and ev != "end":
+            return
+        if ev != "end":
+            self.utterance.append(pcm)
+            if self.feeding_cmd:
+                self._feed_cmd([pcm])
+            elif self.wake is not None:
+                self.wake.accept(pcm)
+                if self.wake_word in self.wake.partial().split():
+                    self._woke(t)
+            return
+        self.segments.append((self.vad.t_start, t))
+        self._end_utterance(t)
+
+    def _woke(self, t):
+        self.wakes += 1
+        self.t_wake = t
+        self.feeding_cmd = True
+        self.on_status("Wake word")
+        # catch the command recognizer up on this utterance so far
+        self._feed_cmd(self.utterance)
+
+    def _feed_cmd(self, frames):
+        if self.cmd is not None:
+            for f in frames:
+                self.cmd.accept(f)
+
+    def _end_utterance(self, t):
+        if self.wake is None:
+            return
+        if not self.feeding_cmd:
+            # the final result is more reliable than partials for short words
+            if self.wake_word in self.wake.final().split():
+                self._woke(t)
+            else:
+                self.wake.reset()
+                return
+        self.wake.reset()
+        t0 = time.perf_counter()
+        text = self.cmd.final()
+        finalize = time.perf_counter() - t0
+        self.cmd.reset()
+        words = [w for w in text.split() if w != self.wake_word]
+        self.feeding_cmd = False
+        if not words:
+            # bare wake word: the next utterance is the command
+            self.awake_until = t + COMMAND_WINDOW_S
+            self.on_status("Listening for command...")
+            return
+        self.awake_until = -1.0
+        self.commands += 1
+        self.wake_to_action.append(t - self.t_wake + finalize)
+        self.end_to_action.append(self.vad.end_n * FRAME_MS / 1000.0 + finalize)
+        self.t_wake = None
+        self.on_command(" ".join(words))
+
+    def run(self, frames, stop=None):
+        for pcm, t in frames:
+            if stop is not None and stop():
+                break
+            self.feed(pcm, t)
+
+    def summary(self):
+        s = (f"voice    floor {self.vad.floor.db:.1f} dBFS  utterances {self.utterances}  "
+             f"wakes {self.wakes}  commands {self.commands}")
+        if self.wake_to_action:
+            w = sorted(self.wake_to_action)
+            e = sorted(self.end_to_action)
+            s += (f"  wake->action p50 {1000 * w[len(w) // 2]:.0f} ms max {1000 * w[-1]:.0f} ms"
+                  f"  speech end->action p50 {1000 * e[len(e) // 2]:.0f} ms")
+        return s
+
+
+# ================= SOURCES =================
+# Each source yields (int16 frame of FRAME samples, audio time in seconds).
+
+def wav_frames(path):
+    with wave.open(path, "rb") as w:
+        rate, ch, width = w.getframerate(), w.getnchannels(), w.getsampwidth()
+        raw = w.readframes(w.getnframes())
+    if width != 2:
+        raise ValueError(f"{path}: only 16-bit PCM WAV is supported")
+    x = np.frombuffer(raw, np.int16).astype(np.float32)
+    if ch > 1:
+        x = x.reshape(-1, ch).mean(axis=1)
+    if rate != SAMPLE_RATE:
+        n = int(len(x) * SAMPLE_RATE / rate)
+        x = np.interp(np.arange(n) * (rate / SAMPLE_RATE), np.arange(len(x)), x)
+    x = np.clip(x, -32768, 32767).astype(np.int16)
+    for i in range(len(x) // FRAME):
+        yield x[i * FRAME:(i + 1) * FRAME], (i + 1) * FRAME / SAMPLE_RATE
+
+
+def mic_frames(stop=None):
+    # pyaudio ships with speech_recognition's microphone support
+    import pyaudio
+    pa = pyaudio.PyAudio()
+    stream = pa.open(format=pyaudio.paInt16, channels=1, rate=SAMPLE_RATE,
+                     input=True, frames_per_buffer=FRAME)
+    n = 0
+    try:
+        while stop is None or not stop():
+            data = stream.read(FRAME, exception_on_overflow=False)
+            n += 1
+            yield np.frombuffer(data, np.int16), n * FRAME / SAMPLE_RATE
+    finally:
+        stream.stop_stream()
+        stream.close()
+        pa.terminate()
+
+
+# ================= CHECK =================
+
+def noise_frames(seconds, levels, bursts=(), seed=0):
+    # white noise; levels: (from_s, dBFS) steps, bursts: (start_s, end_s, dBFS)
+    # 220 Hz tones on top standing in for words
+    rng = np.random.default_rng(seed)
+    tone = np.sin(2 * np.pi * 220 * np.arange(FRAME) / SAMPLE_RATE) * np.sqrt(2)
+    for i in range(int(seconds * 1000) // FRAME_MS):
+        t = (i + 1) * FRAME / SAMPLE_RATE
+        db = [level for start, level in levels if start <= t][-1]
+        x = rng.standard_normal(FRAME) * 32768.0 * 10 ** (db / 20)
+        for a, b, level in bursts:
+            if a <= t < b:
+                x += tone * 32768.0 * 10 ** (level / 20)
+        yield np.clip(x, -32768, 32767).astype(np.int16), t
+
+
+def check():
+    """VAD on synthetic audio; returns the number of failed checks."""
+    cases = [
+        # steady room noise alone must never be speech
+        ("-40 dBFS noise", noise_frames(20, [(0, -40)]), []),
+        ("-60 dBFS noise", noise_frames(20, [(0, -60)]), []),
+        # a fan switched on: at most one false segment, ended by the floor catching up
+        ("-65, then -40 dBFS", noise_frames(20, [(0, -65), (2, -40)]), None),
+        # words 20 dB over the room noise are found with their boundaries
+        ("speech over -40 dBFS", noise_frames(12, [(0, -40)], [(2, 3, -20), (6, 7.5, -20)]),
+         [(2, 3), (6, 7.5)]),
+    ]
+    failed = 0
+    for name, frames, expected in cases:
+        listener = VoiceListener(lambda text: None, recognizers=False)
+        listener.run(frames)
+        seg = listener.segments
+        if expected is None:
+            ok = all(b - a < NOISE_WINDOW_S + MAX_UTTERANCE_S / 2 for a, b in seg) and len(seg) <= 1
+        else:
+            ok = len(seg) == len(expected) and all(
+                abs(a - ea) < 0.1 + PREROLL_MS / 1000 and abs(b - eb) < 0.1 + VAD_END_MS / 1000
+                for (a, b), (ea, eb) in zip(seg, expected))
+        failed += not ok
+        print(f"{'ok  ' if ok else 'FAIL'} {name:<24} floor {listener.vad.floor.db:6.1f} dBFS  "
+              f"segments {[(round(a, 2), round(b, 2)) for a, b in seg]}")
+    return failed
+
+
+def main():
+    if "--check" in sys.argv:
+        sys.exit(1 if check() else 0)
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    model = MODEL_DIR
+    if "--model" in sys.argv:
+        model = sys.argv[sys.argv.index("--model") + 1]
+        args.remove(model)
+    if not args:
+        print("usage: python voice.py recording.wav [...] [--model PATH]")
+        return
+    use_asr = offline_available(model)
+    if not use_asr:
+        print(f"vosk or model {model} not found: VAD only")
+    for path in args:
+        listener = VoiceListener(lambda text: print(f"  command: {text!r}"),
+                                 lambda text: print(f"  [{text}]"),
+                                 model_path=model, recognizers=use_asr)
+        t0 = time.perf_counter()
+        n = 0
+        for pcm, t in wav_frames(path):
+            listener.feed(pcm, t)
+            n += 1
+        wall = time.perf_counter() - t0
+        audio = n * FRAME_MS / 1000.0
+        print(f"{path}: {audio:.1f} s audio in {wall:.2f} s ({audio / max(wall, 1e-9):.0f}x realtime)")
+        for a, b in listener.segments:
+            print(f"  speech {a:6.2f} - {b:6.2f} s")
+        print(listener.summary())
+
+
+if __name__ == "__main__":
+    main()
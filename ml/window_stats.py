@@ -0,0 +1,100 @@
+# window_stats.py
+# Sliding-window order statistics for the per-frame hand tracking filters.
+# Values are kept in a sorted list next to a ring of insertion order, so an
+# append/evict is a binary search plus one memmove instead of re-sorting the
+# whole window every frame.
+
+from bisect import bisect_left, insort
+from collections import deque
+import math
+
+
+class SlidingQuantile:
+    """Window of the last `maxlen` values with O(log n) rank lookups.
+
+    percentile() uses the same linear interpolation as np.percentile's
+    default method, so bounds match the old per-frame np.percentile calls.
+    """
+
+    def __init__(self, maxlen):
+        self.maxlen = maxlen
+        self._order = deque()
+        self._sorted = []
+
+    def __len__(self):
+        return len(self._order)
+
+    def append(self, v):
+        if len(self._order) == self.maxlen:
+            old = self._order.popleft()
+            del self._sorted[bisect_left(self._sorted, old)]
+        self._order.append(v)
+        insort(self._sorted, v)
+
+    def clear(self):
+        self._order.clear()
+        self._sorted.clear()
+
+    def percentile(self, p):
+        s = self._sorted
+        n = len(s)
+        if n == 0:
+            raise ValueError("percentile of empty window")
+        vi = (n - 1) * (p / 100)
+        if vi >= n - 1:
+            return s[-1]
+        lo = math.floor(vi)
+        t = vi - lo
+        a, b = s[lo], s[lo + 1]
+        diff = b - a
+        # same two-sided lerp as numpy, for bit-identical results
+        if t >= 0.5:
+            return b - diff * (1 - t)
+        return a + diff * t
+
+    def median(self):
+        # matches np.median: mean of the two middle values for even n
+        s = self._sorted
+        n = len(s)
+        if n == 0:
+            raise ValueError("median of empty window")
+        mid = n // 2
+        if n % 2:
+            return s[mid]
+        return (s[mid - 1] + s[mid]) / 2.0
+
+
+class AnchorFilter:
+    """Running 2-D median jump filter for the drag anchor.
+
+    Same rule as the old np.median(anchor_hist) block: a sample further than
+    `jump_thresh` from the window median is replaced by the median, and after
+    `stable_req` consecutive in-range samples the median is used as well.
+    """
+
+    def __init__(self, hist_len, jump_thresh, stable_req):
+        self.jump_thresh = jump_thresh
+        self.stable_req = stable_req
+        self.stable_frames = 0
+        self._x = SlidingQuantile(hist_len)
+        self._y = SlidingQuantile(hist_len)
+
+    def update(self, ax, ay):
+        self._x.append(ax)
+        self._y.append(ay)
+        med_x = self._x.median()
+        med_y = self._y.median()
+        if math.hypot(ax - med_x, ay - med_y) > self.jump_thresh:
+            self.stable_frames = 0
+            eff = (med_x, med_y)
+        else:
+            self.stable_frames += 1
+            eff = (ax, ay)
+        if self.stable_frames >= self.stable_req:
+            eff = (med_x, med_y)
+        return eff
+
+    def clear(self):
+        # stable_frames carries over, as the old deque.clear() did
+        self._x.clear()
+        self._y.clear()
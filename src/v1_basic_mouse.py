@@ -1,28 +1,26 @@
+import os
+import sys
 import cv2
 import mediapipe as mp
-import pyautogui
 import time
 
-pyautogui.FAILSAFE = False
-screen_w, screen_h = pyautogui.size()
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ml"))
+from hand_frame import HandFrame
+from gesture_engine import BasicMouseEngine, V1_CURSOR_FILTER_PARAMS
+from pointer import pointer_from_argv
+from cursor_filter import filter_from_config
+from frame_buffers import FrameSlot, MemStats, mirror_hands
+from telemetry import telemetry_from_argv
 
-# ================= PARAMETERS =================
-SMOOTH_ALPHA = 0.2
-DEADZONE = 12
-CLICK_COOLDOWN = 0.6
+pointer = pointer_from_argv()
+screen_w, screen_h = pointer.size()
 
-# ================= STATES =================
-MOVE = "MOVE"
-LEFT_LOCK = "LEFT_LOCK"
-RIGHT_LOCK = "RIGHT_LOCK"
-DRAG_LOCK = "DRAG_LOCK"
-
-state = MOVE
-last_action_time = 0
-
-# HARD cursor anchor (absolute lock)
-cursor_x = screen_w // 2
-cursor_y = screen_h // 2
+# ================= PARAMETERS / STATES =================
+# SMOOTH_ALPHA, DEADZONE, CLICK_COOLDOWN and the MOVE / LEFT_LOCK /
+# RIGHT_LOCK / DRAG_LOCK transition table live in ml/gesture_engine.py (V1_*);
+# --filter=oneeuro etc. swaps the smoothing (see ml/cursor_filter.py)
+engine = BasicMouseEngine(pointer, screen_w, screen_h,
+                          cursor_filter=filter_from_config("ema", V1_CURSOR_FILTER_PARAMS))
 
 # ================= MEDIAPIPE =================
 mp_hands = mp.solutions.hands
@@ -34,93 +32,47 @@ hands = mp_hands.Hands(
 mp_draw = mp.solutions.drawing_utils
 
 cap = cv2.VideoCapture(0)
-
-# ================= HELPERS =================
-def finger_open(lm, tip, pip):
-    return lm[tip].y < lm[pip].y
-
-def all_closed(lm):
-    return all(lm[t].y > lm[p].y for t,p in [(8,6),(12,10),(16,14),(20,18)])
-
-def all_open(lm):
-    return all(lm[t].y < lm[p].y for t,p in [(8,6),(12,10),(16,14),(20,18)])
+hf = HandFrame()
+slot = FrameSlot()      # reused camera/RGB/preview buffers
+mem = MemStats()
+tel = telemetry_from_argv()     # --metrics=FILE / --metrics-port=PORT
 
 # ================= MAIN LOOP =================
 while True:
-    ret, frame = cap.read()
-    if not ret:
+    t = tel.now()
+    if not slot.read(cap):
         break
+    t = tel.record("cap.read", t)
 
-    frame = cv2.flip(frame, 1)
-    rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-    result = hands.process(rgb)
+    # landmarks are mirrored instead of flipping the camera image
+    result = mirror_hands(hands.process(slot.to_rgb()))
+    t = tel.record("hands.process", t)
+    frame = slot.preview()
 
     if result.multi_hand_landmarks:
         hand = result.multi_hand_landmarks[0]
         mp_draw.draw_landmarks(frame, hand, mp_hands.HAND_CONNECTIONS)
-        lm = hand.landmark
-
-        index_open  = finger_open(lm, 8, 6)
-        middle_open = finger_open(lm,12,10)
-
-        now = time.time()
-
-        # ================= LEFT CLICK (INDEX FOLDED) =================
-        if (
-            state == MOVE and
-            not index_open and middle_open and
-            now - last_action_time > CLICK_COOLDOWN
-        ):
-            state = LEFT_LOCK
-            pyautogui.moveTo(cursor_x, cursor_y)
-            pyautogui.click()
-            last_action_time = now
-
-        # ================= RIGHT CLICK (MIDDLE FOLDED) =================
-        elif (
-            state == MOVE and
-            index_open and not middle_open and
-            now - last_action_time > CLICK_COOLDOWN
-        ):
-            state = RIGHT_LOCK
-            pyautogui.moveTo(cursor_x, cursor_y)
-            pyautogui.rightClick()
-            last_action_time = now
-
-        # ================= EXIT CLICK LOCK =================
-        elif state in [LEFT_LOCK, RIGHT_LOCK] and index_open and middle_open:
-            state = MOVE
-
-        # ================= DRAG =================
-        elif state == MOVE and all_closed(lm):
-            state = DRAG_LOCK
-            pyautogui.moveTo(cursor_x, cursor_y)
-            pyautogui.mouseDown()
-
-        elif state == DRAG_LOCK and all_open(lm):
-            pyautogui.mouseUp()
-            state = MOVE
-
-        # ================= MOVE (ONLY HERE) =================
-        if state == MOVE and index_open and middle_open:
-            ix = lm[8].x * screen_w
-            iy = lm[8].y * screen_h
-
-            dx = ix - cursor_x
-            dy = iy - cursor_y
-
-            if abs(dx) > DEADZONE or abs(dy) > DEADZONE:
-                cursor_x += dx * SMOOTH_ALPHA
-                cursor_y += dy * SMOOTH_ALPHA
-                pyautogui.moveTo(cursor_x, cursor_y)
-
-        # ================= HARD LOCK ENFORCEMENT =================
-        if state in [LEFT_LOCK, RIGHT_LOCK, DRAG_LOCK]:
-            pyautogui.moveTo(cursor_x, cursor_y)
-
+        t = tel.now()
+        engine.step(hf.load(hand), time.monotonic())
+        t = tel.record("decision", t)
+        for name in engine.fired:
+            tel.count("gestures", label=name)
+        pointer.flush()
+        t = tel.record("pointer", t)
+
+    t = tel.now()
     cv2.imshow("Hand Mouse – HARD FREEZE MODE (ESC)", frame)
-    if cv2.waitKey(1) & 0xFF == 27:
+    key = cv2.waitKey(1) & 0xFF
+    tel.record("imshow", t)
+    tel.count("frames")
+    mem.tick()
+    if key == 27:
         break
 
 cap.release()
 cv2.destroyAllWindows()
+pointer.close()
+print(pointer.summary())
+print(mem.summary())
+print(tel.summary())
+tel.close()